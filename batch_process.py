@@ -0,0 +1,79 @@
+"""
+Headless-обработка видео без GUI (ночные пересчёты на серверах без дисплея).
+
+Примеры:
+    python batch_process.py videos/ -o results/
+    python batch_process.py "archive/**/*.mp4" -o results/ --workers 4 --recursive
+"""
+import argparse
+import json
+import os
+import sys
+
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
+
+from modules.batch_processor import BatchProcessor, find_videos
+from modules.human_detector import detector_kwargs_from_settings
+from modules.pose_engine import pose_kwargs_from_settings
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Пакетная обработка видео MediaPipe Pose")
+    parser.add_argument("inputs", nargs="+", help="каталоги или glob-шаблоны с видеофайлами")
+    parser.add_argument("-o", "--output", default="batch_output", help="каталог для результатов")
+    parser.add_argument("-w", "--workers", type=int, default=0, help="число процессов (0 — по числу ядер)")
+    parser.add_argument("-r", "--recursive", action="store_true", help="искать видео во вложенных каталогах")
+    parser.add_argument("--force", action="store_true", help="обработать заново, игнорируя манифест")
+    parser.add_argument("--settings", default="settings.json",
+                        help="settings.json: из секции \"pose\" берутся параметры модели, "
+                             "из \"detector\" — гистерезис детектора")
+    parser.add_argument("--model-complexity", type=int, choices=(0, 1, 2))
+    parser.add_argument("--min-detection-confidence", type=float)
+    parser.add_argument("--min-tracking-confidence", type=float)
+    parser.add_argument("--progress", type=float, default=0, metavar="SEC",
+                        help="печатать прогресс каждого видео не чаще раза в SEC секунд (0 — не печатать)")
+    return parser.parse_args(argv)
+
+
+def load_settings(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_pose_kwargs(args, settings):
+    pose_kwargs = pose_kwargs_from_settings(settings)
+    # Явно переданные аргументы важнее settings.json
+    for key in ("model_complexity", "min_detection_confidence", "min_tracking_confidence"):
+        value = getattr(args, key)
+        if value is not None:
+            pose_kwargs[key] = value
+    return pose_kwargs
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    videos = find_videos(args.inputs, recursive=args.recursive)
+    if not videos:
+        print("Видеофайлы не найдены.", file=sys.stderr)
+        return 1
+
+    print(f"Найдено видео: {len(videos)}")
+    settings = load_settings(args.settings)
+    processor = BatchProcessor(
+        args.output,
+        workers=args.workers or None,
+        force=args.force,
+        pose_kwargs=load_pose_kwargs(args, settings),
+        progress_interval=args.progress or None,
+        detector_kwargs=detector_kwargs_from_settings(settings)
+    )
+    result = processor.run(videos)
+    print(f"Готово: обработано {result['processed']}, пропущено {result['skipped']}, "
+          f"ошибок {result['failed']}")
+    return 1 if result['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+Бенчмарк форматов экспорта: размер файла, время записи и время чтения
+для JSON (indent=2), CSV, CSV.gz, CSV.zst, Parquet, Arrow IPC и .npz.
+Форматы без установленной зависимости (zstandard, pyarrow) пропускаются.
+
+    python benchmarks/export_benchmark.py --intervals 200000
+"""
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules.data_exporter import DataExporter, _optional_module
+from modules.human_detector import HumanDetector
+
+
+def make_detector(count, seed=0):
+    rng = np.random.default_rng(seed)
+    starts = 1.7e9 + np.cumsum(rng.exponential(60.0, count))
+    durations = rng.exponential(15.0, count)
+    detector = HumanDetector()
+    for context in ("веб-камера", "видео"):
+        detector.detection_history.extend(starts[:count // 2], starts[:count // 2] + durations[:count // 2],
+                                          durations[:count // 2], context)
+        starts, durations = starts[count // 2:], durations[count // 2:]
+    return detector
+
+
+def read_csv(path, opener=open):
+    with opener(path, "rt", newline="", encoding="utf-8") as f:
+        return sum(1 for _ in csv.reader(f)) - 1
+
+
+def read_zstd_csv(path):
+    zstandard = _optional_module("zstandard")
+    with open(path, "rb") as raw:
+        reader = io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(raw), newline="", encoding="utf-8")
+        return sum(1 for _ in csv.reader(reader)) - 1
+
+
+def read_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return len(json.load(f))
+
+
+def read_npz(path):
+    with np.load(path) as data:
+        return len(data['start'])
+
+
+def read_parquet(path):
+    import pyarrow.parquet as pq
+    return pq.read_table(path).num_rows
+
+
+def read_arrow(path):
+    import pyarrow.ipc
+    with pyarrow.ipc.open_file(path) as reader:
+        return reader.read_all().num_rows
+
+
+def formats():
+    items = [
+        ("JSON (indent=2)", "json", lambda e, p: e.export_to_json(p), read_json),
+        ("CSV", "csv", lambda e, p: e.export_to_csv(p), read_csv),
+        ("CSV.gz", "csv.gz", lambda e, p: e.export_to_csv(p, compression="gzip"),
+         lambda p: read_csv(p, gzip.open)),
+    ]
+    if _optional_module("zstandard") is not None:
+        items.append(("CSV.zst", "csv.zst", lambda e, p: e.export_to_csv(p, compression="zstd"), read_zstd_csv))
+    if _optional_module("pyarrow") is not None:
+        items.append(("Parquet", "parquet", lambda e, p: e.export_columnar(p, fmt="parquet"), read_parquet))
+        items.append(("Arrow IPC", "arrow", lambda e, p: e.export_columnar(p, fmt="arrow"), read_arrow))
+    items.append(("NPZ", "npz", lambda e, p: e.export_to_npz(p), read_npz))
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк форматов экспорта истории детекций")
+    parser.add_argument("--intervals", type=int, default=100000)
+    args = parser.parse_args()
+
+    detector = make_detector(args.intervals)
+    with tempfile.TemporaryDirectory() as tmp:
+        exporter = DataExporter(detector, export_dir=tmp)
+        print(f"Интервалов: {args.intervals}")
+        print(f"{'формат':>16} | {'размер, КБ':>10} | {'запись, с':>9} | {'чтение, с':>9}")
+        for title, extension, write, read in formats():
+            path = os.path.join(tmp, f"bench.{extension}")
+            t0 = time.perf_counter()
+            success, message = write(exporter, path)
+            t_write = time.perf_counter() - t0
+            if not success:
+                print(f"{title:>16} | {message}")
+                continue
+            t0 = time.perf_counter()
+            rows = read(path)
+            t_read = time.perf_counter() - t0
+            assert rows == args.intervals, (title, rows)
+            print(f"{title:>16} | {os.path.getsize(path) / 1024:10.1f} | {t_write:9.3f} | {t_read:9.3f}")
+        exporter.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Бенчмарк холодного старта: время импорта main.py, время до первого
+отображения окна и время до окончания фоновой загрузки (MediaPipe, matplotlib).
+Каждый замер выполняется в отдельном процессе, чтобы кэш модулей не искажал результат,
+и во временном рабочем каталоге (копия settings.json и иконок) — логи, экспорт и прочие
+каталоги приложения не создаются в репозитории. Блокировка единственного экземпляра —
+своя в том же каталоге; закрытие идёт через app.on_closing(), как у окна.
+
+    python benchmarks/startup_benchmark.py --runs 5
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = r'''
+import json, os, time
+t0 = time.perf_counter()
+import main
+t_import = time.perf_counter()
+
+import tkinter as tk
+from modules.single_instance import SingleInstanceLock
+# Запущенное приложение не мешает замеру: блокировка в рабочем каталоге замера
+main.SingleInstanceLock = lambda: SingleInstanceLock(os.path.join(os.getcwd(), "probe.lock"))
+
+root = tk.Tk()
+app = main.SkeletonTrackerApp(root)
+root.update()
+t_window = time.perf_counter()
+
+while not app.startup_loader.is_done:
+    root.update()
+    time.sleep(0.005)
+root.update()
+t_ready = time.perf_counter()
+app.on_closing()
+
+print(json.dumps({
+    "import_sec": t_import - t0,
+    "window_sec": t_window - t0,
+    "ready_sec": t_ready - t0,
+}))
+'''
+
+
+def _prepare_workdir(workdir):
+    settings = os.path.join(ROOT, "settings.json")
+    if os.path.exists(settings):
+        shutil.copy(settings, workdir)
+    icons = os.path.join(ROOT, "icons")
+    if os.path.isdir(icons):
+        shutil.copytree(icons, os.path.join(workdir, "icons"))
+
+
+def run_once():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, env.get("PYTHONPATH")]))
+    with tempfile.TemporaryDirectory(prefix="startup_probe_") as workdir:
+        _prepare_workdir(workdir)
+        result = subprocess.run([sys.executable, "-c", PROBE], cwd=workdir, env=env,
+                                capture_output=True, text=True, timeout=300)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else "probe failed")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк времени запуска приложения")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    samples = [run_once() for _ in range(args.runs)]
+    print(f"Запусков: {len(samples)}")
+    for key, title in (("import_sec", "импорт main"), ("window_sec", "окно показано"),
+                       ("ready_sec", "фоновая загрузка завершена")):
+        values = [s[key] for s in samples]
+        print(f"{title:>28}: медиана {statistics.median(values):.3f} с, "
+              f"мин {min(values):.3f} с, макс {max(values):.3f} с")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,7 @@ translations = {
         "background": "Фон",
         "graph": "График",
         "export": "Экспорт данных",
+        "export_full": "Полный экспорт",
         "settings": "Настройки",
         "error_log": "Показать ошибки",
         "flask_api": "API /status",
@@ -34,6 +35,7 @@ translations = {
         "error_log_title": "🐞 Ошибки",
         "already_running": "Программа уже запущена!\nЗакройте предыдущее окно.",
         "loading": "Загрузка MediaPipe...",
+        "loading_component": "Загрузка:",
         "check_camera": "Проверить камеру",
         "save_settings": "Сохранить настройки",
         "language": "Язык",
@@ -50,6 +52,7 @@ translations = {
         "background": "Background",
         "graph": "Graph",
         "export": "Export Data",
+        "export_full": "Full Export",
         "settings": "Settings",
         "error_log": "Show Errors",
         "flask_api": "API /status",
@@ -73,6 +76,7 @@ translations = {
         "error_log_title": "🐞 Errors",
         "already_running": "Application is already running!\nClose the previous window.",
         "loading": "Loading MediaPipe...",
+        "loading_component": "Loading:",
         "check_camera": "Check Camera",
         "save_settings": "Save Settings",
         "language": "Language",
@@ -1,5 +1,4 @@
 import cv2
-import mediapipe as mp
 import numpy as np
 import os
 import time
@@ -7,17 +6,36 @@ import json
 import sys
 import threading
 import traceback
-from tqdm import tqdm
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox, scrolledtext
+from tkinter import ttk, filedialog, messagebox
 import datetime
+import importlib
 from PIL import Image, ImageTk
 import math
 
-# 👇 Импорты для PRO-функций
-from modules.activity_plot import ActivityPlot
+# 👇 Импорты для PRO-функций (mediapipe и matplotlib грузятся в фоне после показа окна)
 from modules.data_exporter import DataExporter
-from modules.human_detector import HumanDetector
+from modules.export_queue import ExportQueue
+from modules.screenshot_service import ScreenshotService
+from modules.clip_recorder import ClipRecorder
+from modules.ui_event_bus import UIEventBus, LogEvent, ProgressEvent
+from modules.progress_reporter import ProgressReporter, format_progress
+from modules.log_backend import LogBackend, CallbackHandler
+from modules.log_viewer import LogFileIndex, LogViewer, append_capped, line_level
+from modules.human_detector import HumanDetector, DEFAULT_DETECTOR_SETTINGS, detector_kwargs_from_settings
+from modules.video_pipeline import VideoPipeline, format_pipeline_summary
+from modules.parallel_video import ParallelVideoProcessor, format_parallel_summary, MIN_CHUNK_FRAMES
+from modules.frame_grabber import LatestFrameGrabber
+from modules.adaptive_controller import AdaptiveRateController
+from modules.motion_gate import MotionGate
+from modules.frame_pool import FramePool, FrameSlot
+from modules.pose_engine import (PoseEngine, pose_kwargs_from_settings, draw_pose, landmarks_confidence,
+                                 DEFAULT_POSE_SETTINGS)
+from modules.lazy_loader import BackgroundLoader
+from modules.single_instance import SingleInstanceLock
+from modules.landmark_recorder import LandmarkRecorder
+from modules.landmark_cache import LandmarkCache, cache_key
+from modules.detection_history import DetectionHistory
 from i18n import t
 
 # 👇 Подавляем предупреждения TensorFlow и OpenCV
@@ -27,12 +45,9 @@ logging.getLogger('tensorflow').setLevel(logging.ERROR)
 import warnings
 warnings.filterwarnings("ignore", category=UserWarning)
 
-mp_pose = mp.solutions.pose
-mp_drawing = mp.solutions.drawing_utils
-mp_drawing_styles = mp.solutions.drawing_styles
-
 LOG_FILE = "logs.txt"
 ERROR_LOG = "errors.log"
+JSONL_LOG = "logs.jsonl"
 DARK_MODE = True
 
 def get_theme_colors():
@@ -107,17 +122,25 @@ class SkeletonTrackerApp:
         self.root.minsize(900, 650)
 
         # 🔒 Защита от двойного запуска
-        if self.is_already_running():
+        self.instance_lock = SingleInstanceLock()
+        if not self.instance_lock.acquire():
             self.show_duplicate_warning()
             sys.exit(0)
 
+        # 📨 События от рабочих потоков (логи, прогресс, диалоги) применяются только в потоке Tk
+        self.ui_bus = UIEventBus(self.root, error_callback=self._on_ui_error)
+
         self.colors = get_theme_colors()
         self.particle_bg = None  # Будет создано позже
         self.setup_styles()
         self.icons = self.load_icons()
         self.settings_file = "settings.json"
         self.language = "ru"
+        self.log_backend = None
         self.load_settings()
+        self.log_backend = self._create_log_backend()
+        # Индексы строк логов вместе с ротированными файлами — общие для окон просмотра и лог-панели
+        self.log_indexes = {}
 
         # 🟢 Создаём детектор человека ПЕРЕД UI
         self.screenshot_dir = "screenshots"
@@ -125,22 +148,62 @@ class SkeletonTrackerApp:
         os.makedirs(self.screenshot_dir, exist_ok=True)
         os.makedirs(self.exports_dir, exist_ok=True)
 
+        self.screenshot_service = ScreenshotService(
+            self.screenshot_dir,
+            fmt=self.settings.get("screenshot_format", "jpg"),
+            quality=int(self.settings.get("screenshot_quality", 90)),
+            workers=int(self.settings.get("screenshot_workers", 2)),
+            queue_size=int(self.settings.get("screenshot_queue_size", 8)),
+            policy=self.settings.get("screenshot_policy", "drop"),
+            log_callback=self.append_log
+        )
+
         self.human_detector = HumanDetector(
             log_callback=self.append_log,
             log_action_callback=self.log_action,
-            screenshot_dir=self.screenshot_dir
+            screenshot_dir=self.screenshot_dir,
+            screenshot_service=self.screenshot_service,
+            history=self._create_detection_history(),
+            **detector_kwargs_from_settings(self.settings)
+        )
+
+        self.data_exporter = DataExporter(
+            self.human_detector,
+            export_dir=self.exports_dir,
+            rotate_bytes=int(float(self.settings.get("export_rotate_mb", 50)) * 1024 ** 2),
+            rotate_sec=float(self.settings.get("export_rotate_hours", 24)) * 3600,
+            fsync_interval=float(self.settings.get("export_fsync_sec", 5))
         )
+        self.export_queue = ExportQueue(self.root, dispatch=self.ui_bus.dispatch)
 
-        self.data_exporter = DataExporter(self.human_detector)
+        # 🧠 Один граф MediaPipe на всё время работы, прогревается в фоне
+        self.pose_engine = PoseEngine(**pose_kwargs_from_settings(self.settings))
+        self.landmark_cache = None
+        self.activity_plot = None
 
         self.is_camera_active = False
-        self.last_raw_frame = None
-        self.last_processed_frame = None
+        self.frame_grabber = None
+        self.current_fps = 0.0
+        self.rate_controller = AdaptiveRateController(
+            target_fps=float(self.settings.get("target_fps", 20)))
+        self.motion_gate = MotionGate(
+            threshold=float(self.settings.get("motion_threshold", 0.01))
+        ) if self.settings.get("motion_gate", True) else None
+        self.last_raw_frame = FrameSlot()
+        self.last_processed_frame = FrameSlot()
         self.flask_thread = None
         self.is_flask_running = False
+        self.is_video_processing = False
+        self.webcam_thread = None
+        self.video_thread = None
+        # Текущая обработка видео (VideoPipeline или ParallelVideoProcessor) — для stop() при закрытии
+        self.video_pipeline = None
 
         # 🟡 ЗАПУСКАЕМ UI
         self.setup_ui()
+        self.ui_bus.subscribe(LogEvent, self._write_logs)
+        self.ui_bus.subscribe(ProgressEvent, self._apply_progress, coalesce=True)
+        self.ui_bus.start()
 
         # 🟢 Сохраняем ссылки на кнопки
         self.btn_webcam = None
@@ -154,25 +217,47 @@ class SkeletonTrackerApp:
         self.root.bind('<F4>', lambda e: self.toggle_background())
         self.root.bind('<F5>', lambda e: self.open_video_player())
         self.root.bind('<Escape>', lambda e: self.stop_camera())
+        self.root.bind('<Shift-Escape>', lambda e: self.cancel_exports())
+        self.root.bind('<Control-e>', lambda e: self.export_full_data())
         self.root.bind('B', lambda e: self.show_error_log())
         self.root.bind('A', lambda e: self.start_flask_server())
         self.root.bind('L', lambda e: self.select_language())
 
-        # Автозапуск камеры по настройкам
-        if self.settings.get("auto_start_camera", False):
-            self.start_webcam_thread()
+        # ⏳ Тяжёлые модули загружаем после показа окна
+        self.startup_loader = BackgroundLoader([
+            ("MediaPipe", self.pose_engine.warmup),
+            ("matplotlib", lambda: importlib.import_module("modules.activity_plot")),
+        ], self.ui_bus.dispatch, on_progress=self._on_startup_progress,
+            on_done=self._on_startup_done).start()
 
         self.log_action("Программа запущена")
 
-    def is_already_running(self):
-        import psutil
-        current_process = psutil.Process()
-        for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-            if proc.info['name'] == 'python.exe' and proc.info['pid'] != current_process.pid:
-                cmdline = proc.info['cmdline']
-                if cmdline and any('main.py' in arg for arg in cmdline):
-                    return True
-        return False
+    def _on_startup_progress(self, title, value):
+        self.update_progress(f"{self.t('loading_component')} {title}...", value)
+
+    def _on_startup_done(self, errors):
+        for title, error in errors.items():
+            self.append_log(f"⚠️ Не удалось загрузить {title}: {error}", "WARNING")
+
+        if "matplotlib" not in errors:
+            from modules.activity_plot import ActivityPlot
+            self.plot_placeholder.destroy()
+            self.activity_plot = ActivityPlot(
+                self.plot_container, self.human_detector,
+                max_points=int(self.settings.get("activity_plot_points", 300)),
+                interval_ms=int(self.settings.get("activity_plot_interval_ms", 500))
+            )
+            if self.is_camera_active:
+                self.activity_plot.start_update()
+
+        timings = ", ".join(f"{title} {sec:.1f} с" for title, sec in self.startup_loader.timings.items())
+        self.log_action(f"Фоновая загрузка завершена: {timings}")
+        if not self.is_camera_active:
+            self.update_progress(self.t("ready"), 0)
+
+        # Автозапуск камеры по настройкам
+        if self.settings.get("auto_start_camera", False):
+            self.start_webcam_thread()
 
     def show_duplicate_warning(self):
         root = tk.Tk()
@@ -185,7 +270,49 @@ class SkeletonTrackerApp:
             "theme": "dark",
             "auto_start_camera": False,
             "language": "ru",
-            "autoscreenshot_threshold": 3.0
+            "autoscreenshot_threshold": 3.0,
+            "video_workers": 1,
+            "target_fps": 20,
+            "video_target_fps": 0,
+            "motion_gate": True,
+            "motion_threshold": 0.01,
+            "pose": dict(DEFAULT_POSE_SETTINGS),
+            "detector": dict(DEFAULT_DETECTOR_SETTINGS),
+            "record_landmarks": False,
+            "recordings_dir": "recordings",
+            "landmark_cache": True,
+            "landmark_cache_dir": "landmark_cache",
+            "landmark_cache_max_mb": 2048,
+            "history_max_in_memory": 10000,
+            "history_dir": "history",
+            "export_rotate_mb": 50,
+            "export_rotate_hours": 24,
+            "export_fsync_sec": 5,
+            # Полный экспорт: csv / json / parquet / arrow / npz; сжатие CSV — "", "gzip" или "zstd"
+            "export_full_format": "csv",
+            "export_compression": "",
+            "screenshot_format": "jpg",
+            "screenshot_quality": 90,
+            "screenshot_workers": 2,
+            "screenshot_queue_size": 8,
+            "screenshot_policy": "drop",
+            "clip_recording": False,
+            "clips_dir": "clips",
+            "clip_pre_sec": 5,
+            "clip_post_sec": 5,
+            "clip_fps": 15,
+            "clip_scale": 0.5,
+            "clip_max_memory_mb": 64,
+            "progress_interval": 0.25,
+            "log_max_mb": 10,
+            "log_backup_count": 3,
+            "log_flush_sec": 1.0,
+            "log_flush_lines": 256,
+            "log_jsonl": True,
+            "log_view_max_lines": 1000,
+            "log_view_page_lines": 500,
+            "activity_plot_points": 300,
+            "activity_plot_interval_ms": 500
         }
 
         if os.path.exists(self.settings_file):
@@ -262,8 +389,13 @@ class SkeletonTrackerApp:
         main_frame = ttk.Frame(self.root, style='TFrame')
         main_frame.pack(fill=tk.BOTH, expand=True, padx=30, pady=30)
 
-        # 📈 Компактный график активности
-        self.activity_plot = ActivityPlot(main_frame, self.human_detector)
+        # 📈 Компактный график активности — создаётся, когда загрузится matplotlib
+        self.plot_container = tk.Frame(main_frame, bg=self.colors['bg'])
+        self.plot_container.pack(fill=tk.X)
+        self.plot_placeholder = tk.Label(self.plot_container, text=f"📊 {self.t('loading_component')} matplotlib...",
+                                         font=("Segoe UI", 10, "italic"),
+                                         bg=self.colors['bg'], fg=self.colors['status_fg'])
+        self.plot_placeholder.pack(pady=10)
 
         title_frame = tk.Frame(main_frame, bg=self.colors['bg'])
         title_frame.pack(pady=(0, 30))
@@ -303,6 +435,7 @@ class SkeletonTrackerApp:
                 (self.t("background"), self.toggle_background, 'bg', '<F4>'),
                 (self.t("graph"), self.toggle_activity_plot, 'graph', 'G'),
                 (self.t("export"), self.export_data, 'export', 'E'),
+                (self.t("export_full"), self.export_full_data, 'export', '<Control-e>'),
                 (self.t("settings"), self.open_settings, 'settings', 'P'),
                 (self.t("error_log"), self.show_error_log, 'bug', 'B'),
                 (self.t("flask_api"), self.start_flask_server, 'api', 'A'),
@@ -358,6 +491,11 @@ class SkeletonTrackerApp:
                                        bg=self.colors['bg'], fg=self.colors['status_fg'])
         self.progress_label.pack(anchor=tk.W)
 
+        self.perf_label = tk.Label(progress_frame, text="", font=("Segoe UI", 9),
+                                   bg=self.colors['bg'], fg=self.colors['status_fg'])
+        self.perf_label.place(relx=1.0, y=0, anchor=tk.NE)
+        self._refresh_perf_label()
+
         self.progress_canvas = tk.Canvas(progress_frame, height=20, bg=self.colors['progress_bg'],
                                          highlightthickness=0, relief='flat')
         self.progress_canvas.pack(fill=tk.X, pady=(5, 0))
@@ -415,25 +553,65 @@ class SkeletonTrackerApp:
             if hasattr(self, 'btn_stop_camera') and self.btn_stop_camera is not None:
                 self.btn_stop_camera.config(state=tk.DISABLED)
 
+    def _refresh_perf_label(self):
+        if self.is_camera_active:
+            text = f"{self.current_fps:.1f} к/с | {self.rate_controller.describe()}"
+        else:
+            text = ""
+        self.perf_label.config(text=text)
+        self.root.after(500, self._refresh_perf_label)
+
+    def _create_log_backend(self):
+        backend = LogBackend(
+            log_file=LOG_FILE,
+            error_log=ERROR_LOG,
+            jsonl_file=JSONL_LOG if self.settings.get("log_jsonl", True) else None,
+            max_bytes=int(float(self.settings.get("log_max_mb", 10)) * 1024 ** 2),
+            backup_count=int(self.settings.get("log_backup_count", 3)),
+            flush_interval=float(self.settings.get("log_flush_sec", 1.0)),
+            flush_lines=int(self.settings.get("log_flush_lines", 256))
+        )
+        # Лог-панель — обычный handler: записи уходят в UIEventBus, виджет обновляет главный поток
+        backend.add_handler(CallbackHandler(self._post_log), backend.ui,
+                            logging.Formatter("%(asctime)s [%(levelname)s] %(message)s", "%H:%M:%S"))
+        return backend
+
+    def _post_log(self, message, level):
+        self.ui_bus.post(LogEvent(message, level))
+
     def append_log(self, message, level="INFO"):
-        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-        full_message = f"{timestamp} [{level}] {message}\n"
-        self.log_text.config(state=tk.NORMAL)
-        self.log_text.insert(tk.END, full_message, level)
-        self.log_text.see(tk.END)
-        self.log_text.config(state=tk.DISABLED)
-        self.status_bar.config(text=f"{level}: {message}")
+        # Можно вызывать из любого потока: запись в виджет сделает главный поток пачкой
+        if self.log_backend is None:
+            self._post_log(f"{datetime.datetime.now().strftime('%H:%M:%S')} [{level}] {message}", level)
+            return
+        self.log_backend.log(message, level)
+
+    def log_error(self, message):
+        self.log_backend.error(message)
+
+    def _on_ui_error(self, message):
+        # Вызывается шиной внутри except — трассировка попадёт в errors.log
+        if self.log_backend is None:
+            traceback.print_exc()
+            return
+        self.log_error(message)
+
+    def _write_logs(self, events):
+        # В панели — только последние log_view_max_lines строк, полная история в файлах
+        append_capped(self.log_text, [(event.message, event.level) for event in events],
+                      int(self.settings.get("log_view_max_lines", 1000)))
+        last = events[-1]
+        self.status_bar.config(text=f"{last.level}: {last.message.split('] ', 1)[-1]}")
 
     def log_action(self, action):
-        with open(LOG_FILE, "a", encoding="utf-8") as f:
-            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            f.write(f"[{timestamp}] {action}\n")
+        self.log_backend.action(action)
 
     def start_webcam_thread(self):
         if self.is_camera_active:
             self.append_log(self.t("camera_off"), "WARNING")
             return
-        threading.Thread(target=self.process_webcam, daemon=True).start()
+        self.webcam_thread = threading.Thread(target=self.process_webcam, daemon=True)
+        self.webcam_thread.start()
 
     def process_webcam(self):
         self.log_action("Запущена обработка в реальном времени (веб-камера)")
@@ -446,77 +624,132 @@ class SkeletonTrackerApp:
                 self.append_log(error_msg, "ERROR")
                 self.log_action("Ошибка: Не удалось открыть веб-камеру")
                 self.update_progress(error_msg, 0)
-                messagebox.showerror("Ошибка", error_msg)
-                with open(ERROR_LOG, "a", encoding="utf-8") as f:
-                    f.write(f"[{datetime.datetime.now()}] ERROR: Не удалось открыть веб-камеру\n")
-                    f.write(traceback.format_exc() + "\n\n")
-                self.root.after(0, self._update_button_states)
+                self.ui_bus.call(messagebox.showerror, "Ошибка", error_msg)
+                self.log_error("Не удалось открыть веб-камеру")
+                self.ui_bus.call(self._update_button_states)
                 return
         except Exception as e:
             error_msg = self.t("camera_off")
             self.append_log(f"{error_msg}: {str(e)}", "ERROR")
-            with open(ERROR_LOG, "a", encoding="utf-8") as f:
-                f.write(f"[{datetime.datetime.now()}] ERROR: {error_msg}\n")
-                f.write(traceback.format_exc() + "\n\n")
-            messagebox.showerror("Ошибка", error_msg)
-            self.root.after(0, self._update_button_states)
+            self.log_error(error_msg)
+            self.ui_bus.call(messagebox.showerror, "Ошибка", error_msg)
+            self.ui_bus.call(self._update_button_states)
             return
 
         self.is_camera_active = True
-        self.root.after(0, self._update_button_states)
+        self.ui_bus.call(self._update_button_states)
         self.update_progress(self.t("started"), 100)
 
         self.human_detector.reset()
-        self.activity_plot.start_update()
-
-        with mp_pose.Pose(
-                min_detection_confidence=0.5,
-                min_tracking_confidence=0.5) as pose:
-
-            while self.is_camera_active and cap.isOpened():
-                success, image = cap.read()
+        if self.activity_plot is not None:
+            self.ui_bus.call(self.activity_plot.start_update)
+
+        # 🎞️ Захват в отдельном потоке: обрабатываем только самый свежий кадр
+        grabber = self.frame_grabber = LatestFrameGrabber(cap).start()
+        self.current_fps = 0.0
+        last_frame_time = time.perf_counter()
+        controller = self.rate_controller
+        controller.reset()
+        gate = self.motion_gate
+        if gate is not None:
+            gate.reset()
+        pose_landmarks = None
+        # ♻️ Буферы переиспользуются между кадрами, копии делаются только для скриншотов
+        annotated_pool = FramePool()
+        image_rgb = None
+        recorder = self._create_landmark_recorder("webcam", source="веб-камера")
+        clips = self._create_clip_recorder()
+        frame_index = 0
+
+        with self.pose_engine.session() as pose:
+
+            while self.is_camera_active and grabber.is_running:
+                success, raw = grabber.read()
                 if not success:
-                    break
-
-                self.last_raw_frame = image.copy()
-
-                image.flags.writeable = False
-                image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-                results = pose.process(image_rgb)
-
-                image.flags.writeable = True
-                image_bgr = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2BGR)
-
-                if results.pose_landmarks:
-                    mp_drawing.draw_landmarks(
-                        image_bgr,
-                        results.pose_landmarks,
-                        mp_pose.POSE_CONNECTIONS,
-                        landmark_drawing_spec=mp_drawing_styles.get_default_pose_landmarks_style())
-
-                self.human_detector.update(
-                    has_pose_landmarks=bool(results.pose_landmarks),
-                    context="веб-камера",
-                    current_frame=image_bgr
-                )
-
-                self.last_processed_frame = image_bgr.copy()
+                    continue
+
+                image = raw.view()
+                self.last_raw_frame.set(raw)
+
+                # 💤 Статичная сцена без человека — MediaPipe не запускаем. Пока идёт
+                # подтверждение входа/выхода, кадры не пропускаются: иначе гистерезис не наберёт счёт
+                person_tracked = self.human_detector.is_detected or self.human_detector.is_pending
+                gated = gate is not None and not gate.should_infer(image, person_tracked)
+                if gated:
+                    pose_landmarks = None
+                # ⚖️ Контроллер решает, считать ли кадр и в каком разрешении;
+                # на пропущенных кадрах остаются landmarks предыдущего
+                elif controller.should_infer():
+                    infer_start = time.perf_counter()
+                    small = controller.prepare(image)
+                    image_rgb = cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=image_rgb)
+                    pose_landmarks = pose.process(image_rgb).pose_landmarks
+                    controller.record(time.perf_counter() - infer_start)
+
+                annotated = annotated_pool.acquire(image.shape)
+                image_bgr = annotated.array
+                np.copyto(image_bgr, image)
+
+                if pose_landmarks:
+                    draw_pose(image_bgr, pose_landmarks)
+
+                frame_time = time.time()
+                if recorder is not None:
+                    recorder.record(frame_index, pose_landmarks, timestamp=frame_time)
+                frame_index += 1
+
+                was_detected = self.human_detector.is_detected
+                # Пропущенный гейтом кадр — «нет данных», а не «нет человека»: детектор не трогаем
+                if not gated:
+                    self.human_detector.update(
+                        has_pose_landmarks=bool(pose_landmarks),
+                        context="веб-камера",
+                        current_frame=annotated.view(),
+                        timestamp=frame_time,
+                        confidence=landmarks_confidence(pose_landmarks)
+                    )
+
+                # 🎬 Кольцевой буфер для клипов: при появлении человека сохраняем и то, что было до
+                if clips is not None:
+                    clips.push(image_bgr, frame_time)
+                    if self.human_detector.is_detected and not was_detected:
+                        clips.trigger(frame_time)
 
                 cv2.imshow('MediaPipe Skeleton (q - выход, s - скриншот)', image_bgr)
+                self.last_processed_frame.set(annotated)
+
+                now = time.perf_counter()
+                self.current_fps = 0.9 * self.current_fps + 0.1 / max(now - last_frame_time, 1e-6)
+                last_frame_time = now
 
-                key = cv2.waitKey(30) & 0xFF
+                # Темп задаёт камера, waitKey нужен только для событий окна OpenCV
+                key = cv2.waitKey(1) & 0xFF
                 if key == ord('q'):
                     break
                 elif key == ord('s'):
-                    self.root.after(0, self.take_screenshot)
+                    self.ui_bus.call(self.take_screenshot)
 
+        grabber.stop()
         cap.release()
         cv2.destroyAllWindows()
+        self._close_landmark_recorder(recorder)
+        if clips is not None:
+            clips.close()
+        self.human_detector.close(context="веб-камера")
         self.is_camera_active = False
-        self.root.after(0, self._update_button_states)
+        self.current_fps = 0.0
+        self.ui_bus.call(self._update_button_states)
         self.update_progress(self.t("ready"), 0)
+        stats = grabber.stats()
+        self.append_log(f"🎞️ Кадров: захвачено {stats['grabbed']}, обработано {stats['delivered']}, "
+                        f"пропущено {stats['dropped']}", "INFO")
+        if gate is not None:
+            gate_stats = gate.stats()
+            self.append_log(f"💤 Без движения пропущено инференсов: {gate_stats['skipped']} "
+                            f"из {gate_stats['skipped'] + gate_stats['inferred']}", "INFO")
         self.append_log("✅ Веб-камера закрыта.", "SUCCESS")
-        self.activity_plot.stop_update()
+        if self.activity_plot is not None:
+            self.ui_bus.call(self.activity_plot.stop_update)
 
     def stop_camera(self, event=None):
         if self.is_camera_active:
@@ -527,7 +760,7 @@ class SkeletonTrackerApp:
             self.append_log("⚠️ Камера не активна.", "WARNING")
 
     def take_screenshot(self):
-        if self.last_processed_frame is None and self.last_raw_frame is None:
+        if not self.last_processed_frame and not self.last_raw_frame:
             self.append_log("Нет доступного кадра для скриншота.", "ERROR")
             messagebox.showwarning("Предупреждение", "Нет активного изображения для сохранения.")
             return
@@ -536,32 +769,36 @@ class SkeletonTrackerApp:
                                         "Сохранить оба варианта (сырой + с наложением)?\nЕсли 'Нет' — будет запрошен выбор.")
 
         if save_both:
-            frames = [("сырой", self.last_raw_frame), ("с наложением", self.last_processed_frame)]
+            frames = [("сырой", self.last_raw_frame.copy()), ("с наложением", self.last_processed_frame.copy())]
         else:
             use_processed = messagebox.askyesno("Скриншот", "Сохранить кадр с наложенным скелетом?")
-            frame = self.last_processed_frame if use_processed else self.last_raw_frame
+            slot = self.last_processed_frame if use_processed else self.last_raw_frame
             desc = "с наложением" if use_processed else "сырой"
-            frames = [(desc, frame)]
+            frames = [(desc, slot.copy())]
 
+        # Кадры уже скопированы из слотов, кодирование и запись — в пуле сервиса
         for desc, frame in frames:
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"screenshot_{desc}_{timestamp}.jpg"
-            filepath = os.path.join(self.screenshot_dir, filename)
-
-            success = cv2.imwrite(filepath, frame)
-            if success:
-                message = f"📸 {self.t('screenshot_saved')} {filepath}"
-                self.append_log(message, "SUCCESS")
-                self.log_action(f"Скриншот сохранён: {filename}")
-            else:
-                self.append_log(f"Не удалось сохранить скриншот {desc}.", "ERROR")
+            path = self.screenshot_service.save(frame, f"screenshot_{desc}", copy=False,
+                                                on_done=lambda p, ok, d=desc: self._on_screenshot_saved(p, ok, d))
+            if path is None:
+                self.append_log(f"Не удалось сохранить скриншот {desc}: очередь переполнена.", "ERROR")
 
         if save_both:
-            messagebox.showinfo("Скриншот", f"✅ Оба скриншота сохранены в папку:\n{self.screenshot_dir}")
+            messagebox.showinfo("Скриншот", f"✅ Оба скриншота сохраняются в папку:\n{self.screenshot_dir}")
+        else:
+            messagebox.showinfo("Скриншот", "✅ Скриншот сохраняется.")
+
+    def _on_screenshot_saved(self, filepath, success, desc):
+        if success:
+            self.append_log(f"📸 {self.t('screenshot_saved')} {filepath}", "SUCCESS")
+            self.log_action(f"Скриншот сохранён: {os.path.basename(filepath)}")
         else:
-            messagebox.showinfo("Скриншот", "✅ Скриншот сохранён.")
+            self.append_log(f"Не удалось сохранить скриншот {desc}.", "ERROR")
 
     def process_video_file(self):
+        if self.is_video_processing:
+            self.append_log("⚠️ Видео уже обрабатывается, дождитесь окончания.", "WARNING")
+            return
         video_path = filedialog.askopenfilename(
             title="Выберите видеофайл",
             filetypes=[("Видео файлы", "*.mp4 *.avi *.mov *.mkv *.wmv *.flv")]
@@ -578,14 +815,31 @@ class SkeletonTrackerApp:
         save_path = os.path.join(save_dir, "processed_" + os.path.basename(video_path))
         self.log_action(f"Начата обработка видео: {video_path} → {save_path}")
 
+        # Диалоги — в главном потоке, сама обработка — в рабочем
+        self.is_video_processing = True
+        self.video_thread = threading.Thread(target=self._process_video_worker, args=(video_path, save_path),
+                                             daemon=True)
+        self.video_thread.start()
+
+    def _process_video_worker(self, video_path, save_path):
+        try:
+            self._process_video(video_path, save_path)
+        except Exception as e:
+            error_msg = f"Ошибка обработки видео: {e}"
+            self.append_log(error_msg, "ERROR")
+            self.update_progress(self.t("ready"), 0)
+            self.ui_bus.call(messagebox.showerror, "Ошибка", f"❌ {error_msg}")
+            self.log_error(error_msg)
+        finally:
+            self.is_video_processing = False
+
+    def _process_video(self, video_path, save_path):
         cap = cv2.VideoCapture(video_path)
         if not cap.isOpened():
             error_msg = f"Не удалось открыть видеофайл: {video_path}"
             self.append_log(error_msg, "ERROR")
-            messagebox.showerror("Ошибка", f"❌ Не удалось открыть видеофайл:\n{video_path}")
-            with open(ERROR_LOG, "a", encoding="utf-8") as f:
-                f.write(f"[{datetime.datetime.now()}] ERROR: {error_msg}\n")
-                f.write(traceback.format_exc() + "\n\n")
+            self.ui_bus.call(messagebox.showerror, "Ошибка", f"❌ Не удалось открыть видеофайл:\n{video_path}")
+            self.log_error(error_msg)
             return
 
         frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
@@ -593,6 +847,18 @@ class SkeletonTrackerApp:
         fps = int(cap.get(cv2.CAP_PROP_FPS))
         total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
 
+        cache, cache_key_value, cached = self._lookup_landmark_cache(video_path)
+
+        # ⚡ Длинные видео обрабатываются пулом процессов по чанкам; при попадании в кэш
+        # инференса нет — однопроцессный конвейер быстрее
+        workers = self._video_workers()
+        if workers > 1 and total_frames >= 2 * MIN_CHUNK_FRAMES and cached is None:
+            source_fps = cap.get(cv2.CAP_PROP_FPS)
+            cap.release()
+            self._process_video_parallel(video_path, save_path, total_frames, workers, source_fps,
+                                         cache, cache_key_value)
+            return
+
         fourcc = cv2.VideoWriter_fourcc(*'mp4v')
         out = cv2.VideoWriter(save_path, fourcc, fps, (frame_width, frame_height))
 
@@ -600,67 +866,239 @@ class SkeletonTrackerApp:
             error_msg = f"Не удалось создать выходной файл: {save_path}"
             self.append_log(error_msg, "ERROR")
             cap.release()
-            messagebox.showerror("Ошибка", f"❌ Не удалось создать файл:\n{save_path}")
-            with open(ERROR_LOG, "a", encoding="utf-8") as f:
-                f.write(f"[{datetime.datetime.now()}] ERROR: {error_msg}\n")
-                f.write(traceback.format_exc() + "\n\n")
+            self.ui_bus.call(messagebox.showerror, "Ошибка", f"❌ Не удалось создать файл:\n{save_path}")
+            self.log_error(error_msg)
             return
 
         self.append_log(f"Обработка: {os.path.basename(video_path)} | {total_frames} кадров", "INFO")
         self.update_progress("Обработка начата...", 0)
 
         self.human_detector.reset()
+        recorder = self._create_landmark_recorder(
+            os.path.splitext(os.path.basename(video_path))[0],
+            fps=cap.get(cv2.CAP_PROP_FPS), source=video_path)
+
+        rate_controller = self._video_rate_controller()
+        cache_writer = None
+        # С адаптивным пропуском кадров landmarks неполные — в кэш их не кладём
+        if cache is not None and cached is None and rate_controller is None:
+            cache_writer = cache.writer(cache_key_value, fps=cap.get(cv2.CAP_PROP_FPS),
+                                        meta={'source': video_path, 'pose': self.pose_engine.pose_kwargs})
+
+        callbacks = [w.record for w in (recorder, cache_writer) if w is not None]
+
+        def on_result(frame_num, landmarks):
+            for callback in callbacks:
+                callback(frame_num, landmarks)
+
+        reporter = self._video_progress_reporter(total_frames)
+
+        def run_pipeline(pose):
+            pipeline = VideoPipeline(
+                cap, out, pose,
+                human_detector=self.human_detector,
+                context="видео",
+                total_frames=total_frames,
+                progress_callback=reporter,
+                result_callback=on_result if callbacks else None,
+                rate_controller=rate_controller,
+                landmark_source=cached,
+                fps=cap.get(cv2.CAP_PROP_FPS)
+            )
+            reporter.stage_source = pipeline.stage_fps
+            self.video_pipeline = pipeline
+            try:
+                return pipeline.run(), pipeline.stopped
+            finally:
+                self.video_pipeline = None
 
-        with mp_pose.Pose(
-                min_detection_confidence=0.5,
-                min_tracking_confidence=0.5) as pose:
-
-            for frame_num in range(total_frames):
-                success, image = cap.read()
-                if not success:
-                    break
+        try:
+            if cached is not None:
+                self.append_log(f"⚡ Landmarks взяты из кэша ({len(cached)} кадров), инференс пропущен", "SUCCESS")
+                summary, stopped = run_pipeline(None)
+            else:
+                with self.pose_engine.session() as pose:
+                    summary, stopped = run_pipeline(pose)
+        except Exception:
+            if cache_writer is not None:
+                cache.discard(cache_writer)
+            raise
+        finally:
+            cap.release()
+            out.release()
+            self._close_landmark_recorder(recorder)
+
+        if stopped:
+            # Обработка прервана закрытием программы — неполные landmarks в кэш не попадают
+            if cache_writer is not None:
+                cache.discard(cache_writer)
+            self.append_log("⏹️ Обработка видео остановлена.", "WARNING")
+            return
 
-                image.flags.writeable = False
-                image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-                results = pose.process(image_rgb)
+        if cache_writer is not None:
+            try:
+                cache.commit(cache_key_value, cache_writer)
+            except Exception as e:
+                self.append_log(f"❌ Не удалось сохранить landmarks в кэш: {e}", "ERROR")
+
+        self._finish_video_processing(save_path, format_pipeline_summary(summary),
+                                      reporter.finish(summary['frames']))
+
+    def _create_landmark_recorder(self, name, fps=None, source=None):
+        if not self.settings.get("record_landmarks", False):
+            return None
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(self.settings.get("recordings_dir", "recordings"), f"{name}_{timestamp}")
+        return LandmarkRecorder(path, fps=fps, meta={'source': source, 'started': timestamp})
+
+    def _create_clip_recorder(self):
+        if not self.settings.get("clip_recording", False):
+            return None
+        return ClipRecorder(
+            self.settings.get("clips_dir", "clips"),
+            pre_sec=float(self.settings.get("clip_pre_sec", 5)),
+            post_sec=float(self.settings.get("clip_post_sec", 5)),
+            fps=float(self.settings.get("clip_fps", 15)),
+            scale=float(self.settings.get("clip_scale", 0.5)),
+            max_memory_mb=float(self.settings.get("clip_max_memory_mb", 64)),
+            log_callback=self.append_log
+        )
 
-                image.flags.writeable = True
-                image = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2BGR)
+    def _close_landmark_recorder(self, recorder):
+        if recorder is None:
+            return
+        try:
+            meta = recorder.close()
+        except Exception as e:
+            self.append_log(f"❌ Ошибка записи landmarks: {e}", "ERROR")
+            return
+        self.append_log(f"🦴 Landmarks записаны: {recorder.path} ({meta['frames']} кадров)", "SUCCESS")
+
+    def _create_detection_history(self):
+        # Старые интервалы уходят в файл сессии, в памяти — не больше history_max_in_memory
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        spill_path = os.path.join(self.settings.get("history_dir", "history"), f"detections_{timestamp}.bin")
+        return DetectionHistory(max_in_memory=int(self.settings.get("history_max_in_memory", 10000)),
+                                spill_path=spill_path)
+
+    def _landmark_cache(self):
+        if not self.settings.get("landmark_cache", True):
+            return None
+        if self.landmark_cache is None:
+            max_bytes = int(float(self.settings.get("landmark_cache_max_mb", 2048)) * 1024 ** 2)
+            self.landmark_cache = LandmarkCache(
+                self.settings.get("landmark_cache_dir", "landmark_cache"), max_bytes=max_bytes)
+        return self.landmark_cache
+
+    def _lookup_landmark_cache(self, video_path):
+        """(кэш, ключ, CachedLandmarks или None); ошибки кэша не мешают обработке"""
+        cache = self._landmark_cache()
+        if cache is None:
+            return None, None, None
+        try:
+            key = cache_key(video_path, self.pose_engine.pose_kwargs)
+            return cache, key, cache.lookup(key)
+        except Exception as e:
+            self.append_log(f"⚠️ Кэш landmarks недоступен: {e}", "WARNING")
+            return None, None, None
+
+    def _video_rate_controller(self):
+        # Для файлов адаптация выключена по умолчанию: важнее качество результата
+        target_fps = float(self.settings.get("video_target_fps", 0))
+        return AdaptiveRateController(target_fps=target_fps) if target_fps > 0 else None
+
+    def _video_workers(self):
+        # 0 — по числу ядер, 1 — однопроцессный конвейер
+        workers = int(self.settings.get("video_workers", 1))
+        return workers if workers > 0 else (os.cpu_count() or 1)
+
+    def _process_video_parallel(self, video_path, save_path, total_frames, workers, fps, cache, cache_key_value):
+        self.append_log(f"Обработка: {os.path.basename(video_path)} | {total_frames} кадров | "
+                        f"процессов: {workers}", "INFO")
+        self.update_progress("Обработка начата...", 0)
+        self.human_detector.reset()
 
-                if results.pose_landmarks:
-                    mp_drawing.draw_landmarks(
-                        image,
-                        results.pose_landmarks,
-                        mp_pose.POSE_CONNECTIONS,
-                        landmark_drawing_spec=mp_drawing_styles.get_default_pose_landmarks_style())
+        # Landmarks чанков приходят по порядку кадров — запись и кэш те же, что у однопроцессного пути
+        recorder = self._create_landmark_recorder(
+            os.path.splitext(os.path.basename(video_path))[0], fps=fps, source=video_path)
+        cache_writer = None
+        if cache is not None:
+            cache_writer = cache.writer(cache_key_value, fps=fps,
+                                        meta={'source': video_path, 'pose': self.pose_engine.pose_kwargs})
+        sinks = [w for w in (recorder, cache_writer) if w is not None]
+
+        def on_landmarks(records):
+            for sink in sinks:
+                sink.extend(records)
+
+        reporter = self._video_progress_reporter(total_frames)
+        processor = ParallelVideoProcessor(video_path, save_path, workers=workers,
+                                           pose_kwargs=self.pose_engine.pose_kwargs,
+                                           progress_callback=reporter,
+                                           landmark_callback=on_landmarks if sinks else None)
+        # Как и VideoPipeline, останавливается из _stop_workers() при закрытии программы
+        self.video_pipeline = processor
+        try:
+            summary = processor.run(human_detector=self.human_detector, context="видео")
+        except Exception as e:
+            if cache_writer is not None:
+                cache.discard(cache_writer)
+            error_msg = f"Ошибка параллельной обработки видео: {e}"
+            self.append_log(error_msg, "ERROR")
+            self.ui_bus.call(messagebox.showerror, "Ошибка", f"❌ {error_msg}")
+            self.log_error(error_msg)
+            self.update_progress(self.t("ready"), 0)
+            return
+        finally:
+            self.video_pipeline = None
+            self._close_landmark_recorder(recorder)
+
+        if summary is None:
+            if cache_writer is not None:
+                cache.discard(cache_writer)
+            self.append_log("⏹️ Обработка видео остановлена.", "WARNING")
+            return
 
-                self.human_detector.update(
-                    has_pose_landmarks=bool(results.pose_landmarks),
-                    context="видео",
-                    frame_num=frame_num,
-                    current_frame=image
-                )
+        if cache_writer is not None:
+            try:
+                cache.commit(cache_key_value, cache_writer)
+            except Exception as e:
+                self.append_log(f"❌ Не удалось сохранить landmarks в кэш: {e}", "ERROR")
 
-                out.write(image)
+        self._finish_video_processing(save_path, format_parallel_summary(summary),
+                                      reporter.finish(summary['frames']))
 
-                progress = int((frame_num + 1) / total_frames * 100)
-                self.update_progress(f"Обработка... {progress}%", progress)
+    def _finish_video_processing(self, save_path, summary_text, progress=None):
+        # progress — итоговый снимок ProgressReporter.finish(): 100% и средняя скорость в строке статуса
+        self.append_log(summary_text, "INFO")
+        self.log_action(summary_text)
+        self.append_log(f"{self.t('video_saved')} {save_path}", "SUCCESS")
+        self.update_progress(f"Готово | {format_progress(progress)}" if progress else "Готово", 100)
+        self.ui_bus.call(messagebox.showinfo, "Успешно", f"✅ {self.t('video_saved')}\n{save_path}")
+        self.export_data(notify=False)
 
-        cap.release()
-        out.release()
+    def _video_progress_reporter(self, total_frames):
+        # Обновление прогресса ограничено по времени, а не по числу кадров
+        return ProgressReporter(self._on_video_progress, total=total_frames,
+                                interval=float(self.settings.get("progress_interval", 0.25)))
 
-        self.append_log(f"{self.t('video_saved')} {save_path}", "SUCCESS")
-        self.update_progress("Готово", 100)
-        messagebox.showinfo("Успешно", f"✅ {self.t('video_saved')}\n{save_path}")
-        self.export_data()
+    def _on_video_progress(self, snapshot):
+        if not snapshot['total']:
+            return
+        self.update_progress(f"Обработка... {snapshot['percent']}% | {format_progress(snapshot)}",
+                             snapshot['percent'])
 
     def update_progress(self, text, value):
+        # Из любого потока; за тик применяется только последнее значение
+        self.ui_bus.post(ProgressEvent(text, value))
+
+    def _apply_progress(self, events):
+        text, value = events[-1].text, events[-1].value
         self.progress_label.config(text=text)
         canvas_width = self.progress_canvas.winfo_width() or 800
         fill_width = int((value / 100) * canvas_width)
         self.progress_canvas.coords(self.progress_rect, 0, 0, fill_width, 20)
         self.progress_canvas.itemconfig(self.progress_text, text=f"{value}%" if value > 0 else "")
-        self.root.update_idletasks()
 
     def show_logs_window(self):
         log_window = tk.Toplevel(self.root)
@@ -670,25 +1108,8 @@ class SkeletonTrackerApp:
 
         ttk.Label(log_window, text="История операций", font=("Segoe UI", 16, "bold")).pack(pady=10)
 
-        log_text_full = scrolledtext.ScrolledText(log_window,
-                                                  wrap=tk.WORD,
-                                                  font=("Consolas", 10),
-                                                  bg=self.colors['entry_bg'],
-                                                  fg=self.colors['fg'],
-                                                  insertbackground=self.colors['fg'],
-                                                  relief=tk.FLAT,
-                                                  padx=10,
-                                                  pady=10)
-        log_text_full.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
-
-        if os.path.exists(LOG_FILE):
-            with open(LOG_FILE, "r", encoding="utf-8") as f:
-                content = f.read()
-                log_text_full.insert(tk.END, content)
-        else:
-            log_text_full.insert(tk.END, "Лог-файл отсутствует.")
-
-        log_text_full.config(state=tk.DISABLED)
+        # Файл не читается целиком: в окне хвост, старые строки подгружаются при прокрутке
+        self._create_log_viewer(log_window, LOG_FILE).pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         ttk.Button(log_window, text="Закрыть", command=log_window.destroy).pack(pady=10)
 
     def toggle_background(self):
@@ -703,12 +1124,13 @@ class SkeletonTrackerApp:
         player_window.geometry("800x600")
         player_window.minsize(600, 400)
 
+        from video_player import VideoPlayer
         player = VideoPlayer(player_window)
         self.log_action("Открыт проигрыватель видео")
         self.append_log("▶️ Открыт проигрыватель видео", "INFO")
 
     def toggle_activity_plot(self):
-        if hasattr(self, 'activity_plot'):
+        if self.activity_plot is not None:
             if self.activity_plot.is_active:
                 self.activity_plot.stop_update()
                 self.append_log("⏸️ График остановлен.", "INFO")
@@ -716,14 +1138,47 @@ class SkeletonTrackerApp:
                 self.activity_plot.start_update()
                 self.append_log("▶️ График запущен.", "INFO")
 
-    def export_data(self):
-        success, message = self.data_exporter.export_all()
+    def export_data(self, notify=True):
+        # Дописываются только новые интервалы, полная выгрузка — export_full_data().
+        # Запись идёт в фоновом потоке, задания выполняются по очереди
+        self.export_queue.submit(
+            "экспорт", self.data_exporter.export_incremental,
+            on_progress=self._on_export_progress,
+            on_done=lambda job, success, message: self._on_export_done(success, message, notify)
+        )
+
+    def export_full_data(self, notify=True):
+        # Вся история в формате из настроек (export_full_format, export_compression)
+        fmt = self.settings.get("export_full_format", "csv")
+        compression = self.settings.get("export_compression") or None
+        self.export_queue.submit(
+            "полный экспорт", self.data_exporter.export_full,
+            on_progress=self._on_export_progress,
+            on_done=lambda job, success, message: self._on_export_done(success, message, notify),
+            fmt=fmt, compression=compression
+        )
+
+    def cancel_exports(self):
+        pending = self.export_queue.pending()
+        self.export_queue.cancel_all()
+        if pending:
+            self.append_log(f"⏹️ Отмена экспорта: заданий {len(pending)}", "WARNING")
+
+    def _on_export_progress(self, job, done, total):
+        if total:
+            self.update_progress(f"Экспорт: {done}/{total}", int(done / total * 100))
+
+    def _on_export_done(self, success, message, notify):
+        if not self.export_queue.pending():
+            self.update_progress(self.t("ready"), 0)
         if success:
             self.append_log(message, "SUCCESS")
-            messagebox.showinfo("Экспорт", message)
+            if notify:
+                messagebox.showinfo("Экспорт", message)
         else:
-            self.append_log(message, "ERROR")
-            messagebox.showwarning("Ошибка", message)
+            self.append_log(message, "WARNING")
+            if notify:
+                messagebox.showwarning("Экспорт", message)
 
     def open_settings(self):
         settings_win = tk.Toplevel(self.root)
@@ -781,18 +1236,24 @@ class SkeletonTrackerApp:
         log_win.geometry("800x500")
         log_win.configure(bg=self.colors['bg'])
 
-        text = scrolledtext.ScrolledText(log_win, wrap=tk.WORD, font=("Consolas", 9),
-                                         bg=self.colors['entry_bg'], fg=self.colors['fg'],
-                                         relief=tk.FLAT, padx=10, pady=10)
-        text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self._create_log_viewer(log_win, ERROR_LOG, font=("Consolas", 9)).pack(fill=tk.BOTH, expand=True)
+
+    def _log_index(self, path):
+        index = self.log_indexes.get(path)
+        if index is None:
+            index = LogFileIndex(path, backup_count=int(self.settings.get("log_backup_count", 3)))
+            self.log_indexes[path] = index
+        return index
 
-        with open(ERROR_LOG, "r", encoding="utf-8") as f:
-            content = f.read()
-            text.insert(tk.END, content)
-        text.config(state=tk.DISABLED)
+    def _create_log_viewer(self, parent, path, font=("Consolas", 10)):
+        return LogViewer(parent, path, self.colors, self.ui_bus.dispatch,
+                         page_lines=int(self.settings.get("log_view_page_lines", 500)),
+                         font=font,
+                         before_refresh=self.log_backend.flush,
+                         index=self._log_index(path))
 
     def start_flask_server(self):
-        from flask import Flask, jsonify
+        from flask import Flask, jsonify, request
         import threading
 
         if self.is_flask_running:
@@ -806,11 +1267,32 @@ class SkeletonTrackerApp:
             return jsonify({
                 "active": self.is_camera_active,
                 "person_detected": self.human_detector.has_pose_landmarks,
-                "fps": 0,
+                "fps": round(self.current_fps, 1),
                 "detections": len(self.human_detector.detection_history),
-                "last_seen": self.human_detector.last_detection_time
+                "history": self.human_detector.detection_history.stats(),
+                "last_seen": self.human_detector.last_detection_time,
+                "capture": self.frame_grabber.stats() if self.frame_grabber else None,
+                "adaptive": self.rate_controller.state(),
+                "motion_gate": self.motion_gate.stats() if self.motion_gate else None,
+                "screenshots": self.screenshot_service.stats()
             })
 
+        @app.route('/cache')
+        def cache_status():
+            cache = self._landmark_cache()
+            if cache is None:
+                return jsonify({"enabled": False})
+            return jsonify({"enabled": True, **cache.stats(), "items": cache.entries()})
+
+        @app.route('/cache/prune', methods=['POST'])
+        def cache_prune():
+            cache = self._landmark_cache()
+            if cache is None:
+                return jsonify({"enabled": False})
+            max_mb = request.args.get('max_mb', type=float)
+            max_bytes = int(max_mb * 1024 ** 2) if max_mb is not None else None
+            return jsonify({"enabled": True, "removed": cache.prune(max_bytes), **cache.stats()})
+
         @app.route('/shutdown', methods=['POST'])
         def shutdown():
             func = request.environ.get('werkzeug.server.shutdown')
@@ -916,10 +1398,10 @@ class SkeletonTrackerApp:
 
         self.log_text.config(state=tk.NORMAL)
         self.log_text.delete(1.0, tk.END)
-        with open(LOG_FILE, "r", encoding="utf-8") as f:
-            content = f.read()
-            self.log_text.insert(tk.END, content)
-        self.log_text.config(state=tk.DISABLED)
+        self.log_backend.flush()
+        max_lines = int(self.settings.get("log_view_max_lines", 1000))
+        lines = self._log_index(LOG_FILE).tail(max_lines)
+        append_capped(self.log_text, [(line, line_level(line)) for line in lines], max_lines)
 
         self.progress_label.config(text=self.t("ready"))
         self.status_bar.config(text=self.t("ready"))
@@ -935,6 +1417,15 @@ class SkeletonTrackerApp:
                 reverse_map[key] = value
         return reverse_map
 
+    def _stop_workers(self, timeout=5.0):
+        self.is_camera_active = False
+        pipeline = self.video_pipeline
+        if pipeline is not None:
+            pipeline.stop()
+        for thread in (self.webcam_thread, self.video_thread):
+            if thread is not None and thread.is_alive():
+                thread.join(timeout)
+
     def on_closing(self):
         if self.is_flask_running:
             import requests
@@ -944,6 +1435,17 @@ class SkeletonTrackerApp:
                 pass
         if self.particle_bg:
             self.particle_bg.destroy()
+        # Сначала останавливаем рабочие потоки: граф MediaPipe закрывается только вне сеанса
+        self._stop_workers()
+        if not self.pose_engine.close(timeout=5.0):
+            self.log_error("Граф MediaPipe занят рабочим потоком — закрытие пропущено")
+        # Незаписанный инкрементальный экспорт дописываем, очередь не отменяем
+        self.export_queue.shutdown(wait=True)
+        self.data_exporter.close()
+        self.screenshot_service.close()
+        self.ui_bus.stop()
+        self.log_backend.close()
+        self.instance_lock.release()
         self.root.destroy()
 
 def main():
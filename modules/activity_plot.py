@@ -3,18 +3,27 @@ import tkinter as tk
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.pyplot as plt
 import numpy as np
-from datetime import datetime
-import threading
 
 class ActivityPlot:
-    def __init__(self, parent, human_detector, max_points=100):
+    """
+    График присутствия человека. Обновляется таймером root.after в главном
+    потоке Tk; отрисовка через blitting — фон осей кэшируется после полной
+    перерисовки, на каждом тике восстанавливается фон и рисуется только линия.
+    Данные — предвыделенный кольцевой буфер с индексом головы (без np.roll).
+    """
+
+    def __init__(self, parent, human_detector, max_points=100, interval_ms=1500):
         self.parent = parent
         self.human_detector = human_detector
         self.max_points = max_points
-        self.data = np.zeros(max_points)
-        self.timestamps = [datetime.now() for _ in range(max_points)]
+        self.interval_ms = interval_ms
+        self.data = np.zeros(max_points, dtype=np.float32)
+        self.head = 0
         self.is_active = False
-        self.update_thread = None
+        self._job = None
+        self._background = None
+        # Буфер в хронологическом порядке для линии — заполняется на месте
+        self._view = np.zeros(max_points, dtype=np.float32)
 
         self.frame = tk.Frame(parent, bg="#1e1e1e", relief="flat", bd=1) #to do
         self.frame.pack(fill=tk.X, padx=20, pady=(10, 10))
@@ -34,36 +43,55 @@ class ActivityPlot:
         self.ax.set_yticklabels(['Нет', 'Да'], color='#b0b0b0')
         self.ax.grid(True, linestyle='--', alpha=0.3, color='#444')
 
-        self.line, = self.ax.plot([], [], color='#0078d4', linewidth=2)
+        # animated=True: линия не рисуется при полной перерисовке и не попадает в кэш фона
+        self.line, = self.ax.plot(np.arange(max_points), self._view, color='#0078d4',
+                                  linewidth=2, animated=True)
+        self.ax.set_xlim(0, max_points - 1)
 
         self.ax.set_xticks([])
 
         self.canvas = FigureCanvasTkAgg(self.figure, master=self.frame)
         self.canvas.get_tk_widget().pack(fill=tk.X, expand=True)
+        # Полная перерисовка (первый показ, изменение размера) обновляет кэш фона
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+        self.canvas.draw_idle()
 
     def start_update(self):
         if not self.is_active:
             self.is_active = True
-            self.update_thread = threading.Thread(target=self._update_loop, daemon=True)
-            self.update_thread.start()
+            self._tick()
 
     def stop_update(self):
         self.is_active = False
+        if self._job is not None:
+            self.parent.after_cancel(self._job)
+            self._job = None
 
-    def _update_loop(self):
-        while self.is_active:
-            current_state = 1 if self.human_detector.has_pose_landmarks else 0
-
-            self.data = np.roll(self.data, -1)
-            self.data[-1] = current_state
+    def _tick(self):
+        self._job = None
+        if not self.is_active:
+            return
+        self.data[self.head] = 1 if self.human_detector.has_pose_landmarks else 0
+        self.head = (self.head + 1) % self.max_points
+        self._update_plot()
+        self._job = self.parent.after(self.interval_ms, self._tick)
 
-            self.timestamps = self.timestamps[1:] + [datetime.now()]
+    def _update_plot(self):
+        tail = self.max_points - self.head
+        self._view[:tail] = self.data[self.head:]
+        self._view[tail:] = self.data[:self.head]
+        self.line.set_ydata(self._view)
 
-            self._update_plot()
-            self.parent.update_idletasks()
-            self.parent.after(1500)
+        # Свёрнутое/скрытое окно не перерисовываем
+        if not self.canvas.get_tk_widget().winfo_ismapped():
+            return
+        if self._background is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self._background)
+        self.ax.draw_artist(self.line)
+        self.canvas.blit(self.ax.bbox)
 
-    def _update_plot(self):
-        self.line.set_data(range(len(self.data)), self.data)
-        self.ax.set_xlim(0, len(self.data))
-        self.canvas.draw()
\ No newline at end of file
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self.line)
@@ -0,0 +1,114 @@
+# modules/adaptive_controller.py
+import cv2
+
+
+class AdaptiveRateController:
+    """
+    Удерживает целевой FPS: измеряет задержку инференса и на лету меняет
+    масштаб входного кадра и шаг (stride) — на пропущенных кадрах
+    переиспользуются предыдущие landmarks. Сначала снижается разрешение,
+    и только на минимальном масштабе начинают пропускаться кадры.
+    """
+
+    SCALES = (1.0, 0.75, 0.5, 0.35)
+    MAX_STRIDE = 4
+
+    def __init__(self, target_fps=20.0, ema_alpha=0.2, adjust_every=15,
+                 degrade_ratio=1.1, upgrade_ratio=0.6):
+        self.target_fps = target_fps
+        self.ema_alpha = ema_alpha
+        self.adjust_every = adjust_every
+        self.degrade_ratio = degrade_ratio
+        self.upgrade_ratio = upgrade_ratio
+        self.reset()
+
+    def reset(self):
+        self.scale_index = 0
+        self.stride = 1
+        self.latency = None
+        self.frames_seen = 0
+        self.frames_inferred = 0
+        self._since_adjust = 0
+
+    @property
+    def enabled(self):
+        return self.target_fps > 0
+
+    @property
+    def scale(self):
+        return self.SCALES[self.scale_index]
+
+    def should_infer(self):
+        """Вызывается на каждый кадр; False — кадр пропускается, landmarks берутся с прошлого"""
+        index = self.frames_seen
+        self.frames_seen += 1
+        return not self.enabled or index % self.stride == 0
+
+    def prepare(self, image):
+        if not self.enabled or self.scale >= 1.0:
+            return image
+        height, width = image.shape[:2]
+        size = (max(1, int(width * self.scale)), max(1, int(height * self.scale)))
+        return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+    def record(self, latency):
+        """Учитывает длительность одного инференса (сек) и при необходимости меняет режим"""
+        self.frames_inferred += 1
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self.ema_alpha * (latency - self.latency)
+
+        if not self.enabled:
+            return
+        self._since_adjust += 1
+        if self._since_adjust < self.adjust_every:
+            return
+
+        budget = 1.0 / self.target_fps
+        cost = self.latency / self.stride
+        if cost > budget * self.degrade_ratio:
+            self._degrade()
+        elif cost < budget * self.upgrade_ratio:
+            self._upgrade()
+
+    def _degrade(self):
+        if self.scale_index < len(self.SCALES) - 1:
+            self.scale_index += 1
+        elif self.stride < self.MAX_STRIDE:
+            self.stride += 1
+        else:
+            return
+        self._since_adjust = 0
+        # После смены масштаба старая оценка задержки уже не актуальна
+        self.latency = None
+
+    def _upgrade(self):
+        if self.stride > 1:
+            # Шаг уменьшаем, только если с меньшим шагом всё ещё укладываемся в бюджет
+            if self.latency / (self.stride - 1) > 1.0 / self.target_fps:
+                return
+            self.stride -= 1
+        elif self.scale_index > 0:
+            self.scale_index -= 1
+        else:
+            return
+        self._since_adjust = 0
+        self.latency = None
+
+    def state(self):
+        return {
+            'target_fps': self.target_fps,
+            'scale': self.scale,
+            'stride': self.stride,
+            'latency_ms': round(self.latency * 1000, 1) if self.latency is not None else None,
+            'frames_seen': self.frames_seen,
+            'frames_inferred': self.frames_inferred
+        }
+
+    def describe(self):
+        if not self.enabled:
+            return "Адаптация выкл."
+        latency = f"{self.latency * 1000:.0f} мс" if self.latency is not None else "—"
+        return (f"Цель {self.target_fps:g} к/с | масштаб {int(self.scale * 100)}% | "
+                f"шаг {self.stride} | инференс {latency}")
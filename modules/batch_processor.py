@@ -0,0 +1,236 @@
+# modules/batch_processor.py
+import glob
+import hashlib
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import cv2
+
+from modules.data_exporter import DataExporter
+from modules.human_detector import HumanDetector
+from modules.pose_engine import DEFAULT_POSE_SETTINGS, create_pose
+from modules.progress_reporter import ProgressReporter, console_callback
+from modules.video_pipeline import VideoPipeline
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".wmv", ".flv")
+MANIFEST_NAME = "manifest.json"
+
+
+def _input_root(item):
+    """Каталог, от которого считаются относительные пути: сам каталог или неизменяемая часть glob-шаблона"""
+    if os.path.isdir(item):
+        return os.path.abspath(item)
+    parts = []
+    for part in os.path.normpath(item).split(os.sep):
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    else:
+        # Шаблон без метасимволов — путь к файлу
+        parts = parts[:-1]
+    return os.path.abspath(os.sep.join(parts) or os.curdir)
+
+
+def find_videos(inputs, recursive=False):
+    """
+    Собирает видеофайлы из каталогов и glob-шаблонов (без дубликатов, по порядку).
+    Возвращает пары (абсолютный путь, путь относительно входного каталога) —
+    по относительному пути строятся имена результатов, одинаковые имена файлов
+    из разных каталогов не перезаписывают друг друга.
+    """
+    found = []
+    seen = set()
+    used = set()
+    for item in inputs:
+        root = _input_root(item)
+        if os.path.isdir(item):
+            pattern = os.path.join(item, "**", "*") if recursive else os.path.join(item, "*")
+            candidates = sorted(glob.glob(pattern, recursive=recursive))
+        else:
+            candidates = sorted(glob.glob(item, recursive=recursive))
+        for path in candidates:
+            if os.path.isfile(path) and path.lower().endswith(VIDEO_EXTENSIONS):
+                path = os.path.abspath(path)
+                if path in seen:
+                    continue
+                seen.add(path)
+                relative = os.path.relpath(path, root)
+                if relative in used:
+                    # Тот же относительный путь из другого входа — различаем коротким хэшем пути
+                    stem, ext = os.path.splitext(relative)
+                    relative = f"{stem}_{hashlib.blake2b(path.encode('utf-8'), digest_size=4).hexdigest()}{ext}"
+                used.add(relative)
+                found.append((path, relative))
+    return found
+
+
+def output_paths(output_dir, relative):
+    """Пути результатов для видео: дерево каталогов источника повторяется в output_dir и exports/"""
+    rel_dir, name = os.path.split(relative)
+    stem, ext = os.path.splitext(name)
+    # Расширение входит в имя экспорта: cam1.mp4 и cam1.avi в одном каталоге дают разные файлы
+    export_stem = f"{stem}_{ext.lstrip('.').lower()}" if ext else stem
+    exports_dir = os.path.join(output_dir, "exports", rel_dir)
+    return {
+        'video': os.path.join(output_dir, rel_dir, "processed_" + name),
+        'exports_dir': exports_dir,
+        'csv': os.path.join(exports_dir, f"{export_stem}_detections.csv"),
+        'json': os.path.join(exports_dir, f"{export_stem}_detections.json")
+    }
+
+
+class Manifest:
+    """Журнал уже обработанных файлов: повторный запуск пропускает неизменённые видео"""
+
+    def __init__(self, output_dir):
+        self.path = os.path.join(output_dir, MANIFEST_NAME)
+        self.entries = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    @staticmethod
+    def _fingerprint(video_path):
+        stat = os.stat(video_path)
+        return {'size': stat.st_size, 'mtime': stat.st_mtime}
+
+    def is_done(self, video_path):
+        entry = self.entries.get(video_path)
+        if not entry or entry.get('status') != "ok":
+            return False
+        fingerprint = self._fingerprint(video_path)
+        return (entry.get('size') == fingerprint['size']
+                and entry.get('mtime') == fingerprint['mtime']
+                and os.path.exists(entry.get('output', "")))
+
+    def record(self, video_path, result):
+        entry = self._fingerprint(video_path)
+        entry.update(result)
+        entry['processed_at'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.entries[video_path] = entry
+        self.save()
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+def process_video(video_path, output_dir, pose_kwargs=None, progress_interval=None, relative=None,
+                  detector_kwargs=None):
+    """
+    Headless-обработка одного видео: аннотированное видео + CSV/JSON с интервалами.
+    detector_kwargs — гистерезис HumanDetector (секция "detector" settings.json, как в GUI)
+    """
+    started = time.perf_counter()
+    pose_kwargs = pose_kwargs or dict(DEFAULT_POSE_SETTINGS)
+    name = os.path.basename(video_path)
+    paths = output_paths(output_dir, relative or name)
+    save_path = paths['video']
+    os.makedirs(os.path.dirname(save_path), exist_ok=True)
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"Не удалось открыть видеофайл: {video_path}")
+
+    fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+    out = cv2.VideoWriter(save_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+    if not out.isOpened():
+        cap.release()
+        raise IOError(f"Не удалось создать выходной файл: {save_path}")
+
+    human_detector = HumanDetector(**(detector_kwargs or {}))
+    try:
+        with create_pose(**pose_kwargs) as pose:
+            reporter = None
+            if progress_interval:
+                reporter = ProgressReporter(console_callback(prefix=f"[{relative or name}] "), total=total_frames,
+                                            interval=progress_interval)
+            pipeline = VideoPipeline(cap, out, pose, human_detector=human_detector,
+                                     context=name, total_frames=total_frames, fps=fps,
+                                     progress_callback=reporter)
+            if reporter is not None:
+                reporter.stage_source = pipeline.stage_fps
+            summary = pipeline.run()
+            if reporter is not None:
+                reporter.finish(summary['frames'])
+    finally:
+        cap.release()
+        out.release()
+
+    exporter = DataExporter(human_detector, export_dir=paths['exports_dir'])
+    csv_path = paths['csv']
+    json_path = paths['json']
+    has_data, _ = exporter.export_to_csv(csv_path)
+    exporter.export_to_json(json_path)
+
+    return {
+        'status': "ok",
+        'output': save_path,
+        'csv': csv_path if has_data else None,
+        'json': json_path if has_data else None,
+        'frames': summary['frames'],
+        'detections': len(human_detector.detection_history),
+        'elapsed_sec': round(time.perf_counter() - started, 3)
+    }
+
+
+def _run_job(job):
+    video_path, relative, output_dir, pose_kwargs, progress_interval, detector_kwargs = job
+    try:
+        return video_path, process_video(video_path, output_dir, pose_kwargs, progress_interval, relative,
+                                         detector_kwargs)
+    except Exception as e:
+        return video_path, {'status': "error", 'error': str(e), 'traceback': traceback.format_exc()}
+
+
+class BatchProcessor:
+    """Пакетная обработка набора видео пулом процессов с учётом манифеста"""
+
+    def __init__(self, output_dir, workers=None, force=False, pose_kwargs=None, log=print, progress_interval=None,
+                 detector_kwargs=None):
+        self.output_dir = output_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.force = force
+        self.pose_kwargs = pose_kwargs
+        self.detector_kwargs = detector_kwargs
+        self.log = log
+        self.progress_interval = progress_interval
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.manifest = Manifest(self.output_dir)
+
+    def run(self, videos):
+        """videos — пары (путь, относительный путь) из find_videos"""
+        pending = [(path, relative) for path, relative in videos if self.force or not self.manifest.is_done(path)]
+        skipped = len(videos) - len(pending)
+        if skipped:
+            self.log(f"⏭️ Пропущено (уже обработано): {skipped}")
+        if not pending:
+            return {'total': len(videos), 'processed': 0, 'skipped': skipped, 'failed': 0}
+
+        processed = failed = 0
+        jobs = [(path, relative, self.output_dir, self.pose_kwargs, self.progress_interval, self.detector_kwargs)
+                for path, relative in pending]
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(jobs))) as pool:
+            futures = [pool.submit(_run_job, job) for job in jobs]
+            for future in as_completed(futures):
+                video_path, result = future.result()
+                self.manifest.record(video_path, result)
+                if result['status'] == "ok":
+                    processed += 1
+                    self.log(f"✅ [{processed + failed}/{len(jobs)}] {video_path} → {result['output']} "
+                             f"({result['frames']} кадров, {result['elapsed_sec']} с)")
+                else:
+                    failed += 1
+                    self.log(f"❌ [{processed + failed}/{len(jobs)}] {video_path}: {result['error']}")
+
+        return {'total': len(videos), 'processed': processed, 'skipped': skipped, 'failed': failed}
@@ -0,0 +1,164 @@
+# modules/clip_recorder.py
+import collections
+import os
+import queue
+import threading
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+_STOP = object()
+
+
+class ClipRecorder:
+    """
+    Кольцевой буфер последних кадров веб-камеры (уменьшенных и сжатых в JPEG)
+    для клипов с предысторией: по trigger() в MP4 уходят pre_sec секунд до
+    события и post_sec после. Буфер ограничен и по времени, и по памяти
+    (max_memory_mb — вместе с клипами, ждущими записи); запись MP4 — в фоновом
+    потоке с фактической частотой кадров клипа.
+    """
+
+    def __init__(self, directory, pre_sec=5.0, post_sec=5.0, fps=15.0, scale=0.5,
+                 jpeg_quality=80, max_memory_mb=64, log_callback=None):
+        self.directory = directory
+        self.pre_sec = pre_sec
+        self.post_sec = post_sec
+        self.fps = fps
+        self.scale = scale
+        self.jpeg_quality = jpeg_quality
+        self.max_bytes = int(max_memory_mb * 1024 ** 2)
+        self.log_callback = log_callback
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._ring = collections.deque()
+        self._ring_bytes = 0
+        self._last_push = None
+        self._small = None
+        self._clip = None
+        self._clip_bytes = 0
+        self._post_until = None
+        self._clip_started = None
+        self._queued_bytes = 0
+        self._queued_lock = threading.Lock()
+        self.clips_written = 0
+
+        self._write_queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    @property
+    def queued_bytes(self):
+        with self._queued_lock:
+            return self._queued_bytes
+
+    def push(self, frame, timestamp):
+        """Кадр из цикла захвата; чаще fps кадры не сохраняются"""
+        if self._last_push is not None and timestamp - self._last_push < 1.0 / self.fps:
+            return
+        self._last_push = timestamp
+
+        encoded = self._encode(frame)
+        if encoded is None:
+            return
+
+        # Клипы в очереди на запись тоже занимают память — их объём вычитается из лимита
+        budget = self.max_bytes - self.queued_bytes
+
+        if self._clip is not None:
+            # Пост-ролл копится в самом клипе; кадр, который не помещается в лимит, завершает клип —
+            # пропусков внутри клипа не бывает
+            if self._clip_bytes + len(encoded) > budget:
+                self._finish_clip()
+                budget = self.max_bytes - self.queued_bytes
+            else:
+                self._clip.append((timestamp, encoded))
+                self._clip_bytes += len(encoded)
+                if timestamp >= self._post_until:
+                    self._finish_clip()
+                return
+
+        self._ring.append((timestamp, encoded))
+        self._ring_bytes += len(encoded)
+        while self._ring and (timestamp - self._ring[0][0] > self.pre_sec or self._ring_bytes > budget):
+            _, dropped = self._ring.popleft()
+            self._ring_bytes -= len(dropped)
+
+    def trigger(self, timestamp):
+        """Событие (человек появился): начинаем клип или продлеваем пост-ролл текущего"""
+        self._post_until = timestamp + self.post_sec
+        if self._clip is not None:
+            return
+        self._clip = list(self._ring)
+        self._clip_bytes = self._ring_bytes
+        self._ring.clear()
+        self._ring_bytes = 0
+        self._clip_started = datetime.fromtimestamp(timestamp)
+
+    def close(self):
+        if self._clip is not None:
+            self._finish_clip()
+        self._write_queue.put(_STOP)
+        self._writer.join()
+
+    def _encode(self, frame):
+        if self.scale != 1.0:
+            size = (max(2, int(frame.shape[1] * self.scale)) // 2 * 2,
+                    max(2, int(frame.shape[0] * self.scale)) // 2 * 2)
+            self._small = cv2.resize(frame, size, dst=self._small, interpolation=cv2.INTER_AREA)
+            frame = self._small
+        success, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, int(self.jpeg_quality)])
+        return buffer.tobytes() if success else None
+
+    def _finish_clip(self):
+        frames, self._clip = self._clip, None
+        size, self._clip_bytes = self._clip_bytes, 0
+        self._post_until = None
+        if not frames:
+            return
+        with self._queued_lock:
+            self._queued_bytes += size
+        name = f"clip_{self._clip_started.strftime('%Y%m%d_%H%M%S_%f')}.mp4"
+        self._write_queue.put((os.path.join(self.directory, name), frames, size))
+
+    def _clip_fps(self, frames):
+        """Фактическая частота кадров клипа: push() ограничивает её сверху, камера может давать меньше"""
+        duration = frames[-1][0] - frames[0][0]
+        if len(frames) < 2 or duration <= 0:
+            return self.fps
+        return min(self.fps, (len(frames) - 1) / duration)
+
+    def _write_loop(self):
+        while True:
+            item = self._write_queue.get()
+            if item is _STOP:
+                break
+            path, frames, size = item
+            try:
+                self._write_clip(path, frames)
+            except Exception as e:
+                if self.log_callback:
+                    self.log_callback(f"❌ Ошибка записи клипа {path}: {e}", "ERROR")
+            finally:
+                with self._queued_lock:
+                    self._queued_bytes -= size
+
+    def _write_clip(self, path, frames):
+        fps = self._clip_fps(frames)
+        out = None
+        try:
+            for _, encoded in frames:
+                image = cv2.imdecode(np.frombuffer(encoded, dtype=np.uint8), cv2.IMREAD_COLOR)
+                if out is None:
+                    height, width = image.shape[:2]
+                    out = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+                    if not out.isOpened():
+                        raise IOError("не удалось открыть VideoWriter")
+                out.write(image)
+        finally:
+            if out is not None:
+                out.release()
+        self.clips_written += 1
+        if self.log_callback:
+            self.log_callback(f"🎬 Клип сохранён: {path} ({len(frames) / fps:.1f} сек, {fps:.1f} к/с)", "SUCCESS")
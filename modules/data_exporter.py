@@ -1,50 +1,348 @@
 # modules/data_exporter.py
 import csv
+import gzip
+import importlib
+import io
 import json
 import os
+import sys
+import threading
+import time
+import zipfile
 from datetime import datetime
 
+import numpy as np
+
+from modules.detection_history import HISTORY_DTYPE
+
+
+def _optional_module(name):
+    """Необязательная зависимость (pyarrow, zstandard): модуль или None"""
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+CSV_HEADER = ["Время начала", "Время окончания", "Длительность (сек)", "Контекст"]
+
+# Как часто (в записях) сообщать прогресс и проверять отмену задания экспорта
+PROGRESS_EVERY = 4096
+
+
+def _iter_with_progress(entries, total, job):
+    for index, entry in enumerate(entries):
+        if job is not None and index % PROGRESS_EVERY == 0:
+            job.step(index, total)
+        yield entry
+    if job is not None:
+        job.step(total, total)
+
+
+class RollingWriter:
+    """
+    Append-only файл с ротацией: новый файл при превышении max_bytes или
+    возраста max_age_sec. Данные сбрасываются в ОС при каждой записи,
+    fsync — не чаще раза в fsync_interval секунд; если интервал ещё не прошёл,
+    fsync откладывается на таймер, а не до следующей записи.
+    """
+
+    def __init__(self, directory, prefix, extension, header=None,
+                 max_bytes=50 * 1024 ** 2, max_age_sec=24 * 3600, fsync_interval=5.0):
+        self.directory = directory
+        self.prefix = prefix
+        self.extension = extension
+        self.header = header
+        self.max_bytes = max_bytes
+        self.max_age_sec = max_age_sec
+        self.fsync_interval = fsync_interval
+        self.path = None
+        self._file = None
+        self._opened_at = 0.0
+        self._last_fsync = 0.0
+        self._dirty = False
+        self._sync_timer = None
+        # Запись идёт из потока экспорта, отложенный fsync — из потока таймера
+        self._lock = threading.RLock()
+
+    def write(self, text):
+        with self._lock:
+            if self._file is None or self._should_rotate():
+                self._rotate()
+            self._file.write(text)
+            self._file.flush()
+            self._dirty = True
+            self._sync()
+
+    def _sync(self):
+        if not self._dirty or self._file is None:
+            return
+        elapsed = time.monotonic() - self._last_fsync
+        if elapsed >= self.fsync_interval:
+            os.fsync(self._file.fileno())
+            self._last_fsync = time.monotonic()
+            self._dirty = False
+        elif self._sync_timer is None:
+            self._sync_timer = threading.Timer(self.fsync_interval - elapsed, self._deferred_sync)
+            self._sync_timer.daemon = True
+            self._sync_timer.start()
+
+    def _deferred_sync(self):
+        with self._lock:
+            self._sync_timer = None
+            try:
+                self._sync()
+            except OSError as e:
+                # Поток таймера: сообщить некому, кроме stderr; следующий write() попробует снова
+                sys.stderr.write(f"❌ Ошибка fsync {self.path}: {e}\n")
+
+    def _should_rotate(self):
+        return (self._file.tell() >= self.max_bytes
+                or time.monotonic() - self._opened_at >= self.max_age_sec)
+
+    def _rotate(self):
+        self.close()
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.path = os.path.join(self.directory, f"{self.prefix}_{timestamp}.{self.extension}")
+        index = 1
+        while os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+            self.path = os.path.join(self.directory, f"{self.prefix}_{timestamp}_{index}.{self.extension}")
+            index += 1
+        self._file = open(self.path, "a", encoding="utf-8", newline="")
+        self._opened_at = time.monotonic()
+        if self.header and self._file.tell() == 0:
+            self._file.write(self.header)
+
+    def close(self):
+        with self._lock:
+            if self._sync_timer is not None:
+                self._sync_timer.cancel()
+                self._sync_timer = None
+            if self._file is None:
+                return
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+            self._dirty = False
+
+
 class DataExporter:
-    def __init__(self, human_detector, export_dir="exports"):
+    def __init__(self, human_detector, export_dir="exports", rotate_bytes=50 * 1024 ** 2,
+                 rotate_sec=24 * 3600, fsync_interval=5.0):
         self.human_detector = human_detector
         self.export_dir = export_dir
         os.makedirs(self.export_dir, exist_ok=True)
 
-    def export_to_csv(self, filename=None):
+        # Инкрементальный экспорт: позиция в истории, до которой всё уже выгружено
+        self.cursor = 0
+        rolling = dict(max_bytes=rotate_bytes, max_age_sec=rotate_sec, fsync_interval=fsync_interval)
+        self._csv_writer = RollingWriter(self.export_dir, "detections", "csv",
+                                         header=self._csv_rows([CSV_HEADER]), **rolling)
+        self._jsonl_writer = RollingWriter(self.export_dir, "detections", "jsonl", **rolling)
+
+    def export_incremental(self, job=None):
+        """Дописывает в текущие CSV / JSON Lines только интервалы, появившиеся с прошлого вызова"""
+        history = self.human_detector.detection_history
+        if self.cursor > len(history):
+            # История очищена — начинаем сначала
+            self.cursor = 0
+        # При отмене до записи курсор не сдвигается — интервалы уйдут в следующий экспорт
+        entries = list(_iter_with_progress(history.iter_from(self.cursor), len(history) - self.cursor, job))
+        if not entries:
+            return False, "Нет новых данных для экспорта."
+
+        self._csv_writer.write(self._csv_rows(
+            [e['start_time'], e['end_time'], f"{e['duration']:.2f}", e['context']] for e in entries))
+        self._jsonl_writer.write("".join(
+            json.dumps(dict(e.as_dict(), start_ts=e.start, end_ts=e.end), ensure_ascii=False) + "\n"
+            for e in entries))
+        self.cursor += len(entries)
+        return True, (f"Экспорт: +{len(entries)} интервалов → "
+                      f"{self._csv_writer.path}, {self._jsonl_writer.path}")
+
+    def close(self):
+        self._csv_writer.close()
+        self._jsonl_writer.close()
+
+    @staticmethod
+    def _csv_rows(rows):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue()
+
+    def export_to_csv(self, filename=None, compression=None, job=None):
+        """CSV целиком; compression — None, "gzip" или "zstd" (нужен пакет zstandard)"""
         if not self.human_detector.detection_history:
             return False, "Нет данных для экспорта."
 
+        if compression == "zstd" and _optional_module("zstandard") is None:
+            return False, "Для сжатия zstd установите пакет zstandard."
+        extension = {None: "csv", "gzip": "csv.gz", "zstd": "csv.zst"}[compression]
         if not filename:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{self.export_dir}/detections_{timestamp}.csv"
-
-        with open(filename, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(["Время начала", "Время окончания", "Длительность (сек)", "Контекст"])
-            for entry in self.human_detector.detection_history:
-                writer.writerow([
-                    entry['start_time'],
-                    entry['end_time'],
-                    f"{entry['duration']:.2f}",
-                    entry['context']
-                ])
+            filename = self._default_filename(extension)
+
+        try:
+            with self._open_text(filename, compression) as f:
+                writer = csv.writer(f)
+                writer.writerow(CSV_HEADER)
+                history = self.human_detector.detection_history
+                for entry in _iter_with_progress(history, len(history), job):
+                    writer.writerow([
+                        entry['start_time'],
+                        entry['end_time'],
+                        f"{entry['duration']:.2f}",
+                        entry['context']
+                    ])
+        except Exception:
+            # Отмена или ошибка — недописанный файл не оставляем
+            self._remove_partial(filename)
+            raise
 
         return True, f"Экспорт в CSV: {filename}"
 
-    def export_to_json(self, filename=None):
+    def export_to_json(self, filename=None, job=None):
         if not self.human_detector.detection_history:
             return False, "Нет данных для экспорта."
 
         if not filename:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{self.export_dir}/detections_{timestamp}.json"
+            filename = self._default_filename("json")
 
+        history = self.human_detector.detection_history
+        entries = [entry.as_dict() for entry in _iter_with_progress(history, len(history), job)]
         with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(self.human_detector.detection_history, f, indent=2, ensure_ascii=False)
+            json.dump(entries, f, indent=2, ensure_ascii=False)
 
         return True, f"Экспорт в JSON: {filename}"
 
-    def export_all(self):
-        success_csv, msg_csv = self.export_to_csv()
-        success_json, msg_json = self.export_to_json()
+    def export_columnar(self, filename=None, fmt="parquet", job=None):
+        """
+        Колоночный экспорт с типизированными столбцами (start/end — время, duration — float64,
+        context — словарь строк). fmt: "parquet" или "arrow" (нужен pyarrow); без pyarrow —
+        .npz из numpy. История пишется блоками, целиком в память не собирается; экспортируются
+        записи, которые были на момент вызова (контексты взяты на тот же момент).
+        """
+        history = self.human_detector.detection_history
+        contexts, total = history.snapshot()
+        if not total:
+            return False, "Нет данных для экспорта."
+
+        pa = _optional_module("pyarrow")
+        if pa is None:
+            return self.export_to_npz(None if filename is None else os.path.splitext(filename)[0] + ".npz", job=job)
+
+        if not filename:
+            filename = self._default_filename("parquet" if fmt == "parquet" else "arrow")
+        schema = pa.schema([
+            ("start", pa.timestamp("ms")),
+            ("end", pa.timestamp("ms")),
+            ("duration", pa.float64()),
+            ("context", pa.dictionary(pa.int32(), pa.string())),
+        ])
+        contexts = pa.array(contexts, type=pa.string())
+
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+            writer = pq.ParquetWriter(filename, schema, compression="zstd")
+        else:
+            import pyarrow.ipc
+            writer = pyarrow.ipc.new_file(filename, schema)
+        done = 0
+        try:
+            for chunk in history.iter_arrays(0, total):
+                if job is not None:
+                    job.step(done, total)
+                done += len(chunk)
+                writer.write_batch(pa.record_batch([
+                    pa.array((chunk['start'] * 1000).astype('int64'), type=pa.timestamp("ms")),
+                    pa.array((chunk['end'] * 1000).astype('int64'), type=pa.timestamp("ms")),
+                    pa.array(chunk['duration']),
+                    pa.DictionaryArray.from_arrays(pa.array(chunk['context'].astype('int32')), contexts),
+                ], schema=schema))
+        except Exception:
+            writer.close()
+            self._remove_partial(filename)
+            raise
+        writer.close()
+
+        return True, f"Экспорт в {fmt.capitalize()}: {filename}"
+
+    def export_to_npz(self, filename=None, job=None):
+        """
+        Колоночный экспорт без внешних зависимостей: np.load(...)['start'] и т.д.
+        Формат тот же, что у np.savez_compressed, но каждый столбец пишется в архив
+        блоками истории — отдельным проходом, без сборки всей истории в память.
+        """
+        history = self.human_detector.detection_history
+        contexts, total = history.snapshot()
+        if not total:
+            return False, "Нет данных для экспорта."
+
+        if not filename:
+            filename = self._default_filename("npz")
+        columns = ('start', 'end', 'duration', 'context')
+        try:
+            with zipfile.ZipFile(filename, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                for index, column in enumerate(columns):
+                    with archive.open(f"{column}.npy", "w", force_zip64=True) as f:
+                        np.lib.format.write_array_header_1_0(f, {
+                            'descr': np.lib.format.dtype_to_descr(HISTORY_DTYPE[column]),
+                            'fortran_order': False,
+                            'shape': (total,)
+                        })
+                        done = 0
+                        for chunk in history.iter_arrays(0, total):
+                            if job is not None:
+                                job.step(index * total + done, len(columns) * total)
+                            f.write(np.ascontiguousarray(chunk[column]).tobytes())
+                            done += len(chunk)
+                    if done != total:
+                        # История очищена во время экспорта — столбец не совпадает с заголовком
+                        raise RuntimeError(f"История изменилась во время экспорта ({done} из {total} записей)")
+                with archive.open("contexts.npy", "w") as f:
+                    np.lib.format.write_array(f, np.array(contexts, dtype=str))
+        except Exception:
+            self._remove_partial(filename)
+            raise
+        return True, f"Экспорт в NPZ: {filename}"
+
+    def _default_filename(self, extension):
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return f"{self.export_dir}/detections_{timestamp}.{extension}"
+
+    @staticmethod
+    def _remove_partial(filename):
+        try:
+            os.remove(filename)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _open_text(filename, compression):
+        if compression == "gzip":
+            return gzip.open(filename, "wt", newline='', encoding='utf-8')
+        if compression == "zstd":
+            zstandard = _optional_module("zstandard")
+            return io.TextIOWrapper(zstandard.ZstdCompressor().stream_writer(open(filename, "wb")),
+                                    newline='', encoding='utf-8')
+        return open(filename, 'w', newline='', encoding='utf-8')
+
+    def export_full(self, fmt="csv", compression=None, job=None):
+        """
+        Полная выгрузка истории в одном формате: "csv" (compression — None, "gzip"
+        или "zstd"), "json", "parquet", "arrow" (без pyarrow — .npz) или "npz"
+        """
+        if fmt == "csv":
+            return self.export_to_csv(compression=compression, job=job)
+        if fmt == "json":
+            return self.export_to_json(job=job)
+        if fmt in ("parquet", "arrow"):
+            return self.export_columnar(fmt=fmt, job=job)
+        if fmt == "npz":
+            return self.export_to_npz(job=job)
+        return False, f"Неизвестный формат экспорта: {fmt}"
+
+    def export_all(self, job=None):
+        success_csv, msg_csv = self.export_to_csv(job=job)
+        success_json, msg_json = self.export_to_json(job=job)
         return success_csv and success_json, f"{msg_csv}\n{msg_json}"
\ No newline at end of file
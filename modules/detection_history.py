@@ -0,0 +1,271 @@
+# modules/detection_history.py
+import json
+import os
+import tempfile
+import threading
+import weakref
+from datetime import datetime
+
+import numpy as np
+
+# Одна запись истории: время начала/конца (epoch, сек), длительность и id контекста
+HISTORY_DTYPE = np.dtype([
+    ('start', '<f8'),
+    ('end', '<f8'),
+    ('duration', '<f8'),
+    ('context', '<u2'),
+])
+
+_READ_CHUNK = 4096
+
+
+def _remove_files(*paths):
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def format_time(ts):
+    return datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class DetectionRecord:
+    """Лёгкое представление интервала; поддерживает старый доступ record['start_time']"""
+
+    __slots__ = ('start', 'end', 'duration', 'context')
+
+    def __init__(self, start, end, duration, context):
+        self.start = start
+        self.end = end
+        self.duration = duration
+        self.context = context
+
+    def __getitem__(self, key):
+        if key == 'start_time':
+            return format_time(self.start)
+        if key == 'end_time':
+            return format_time(self.end)
+        if key in ('duration', 'context'):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def as_dict(self):
+        return {
+            'start_time': format_time(self.start),
+            'end_time': format_time(self.end),
+            'duration': self.duration,
+            'context': self.context
+        }
+
+
+class DetectionHistory:
+    """
+    Компактная история интервалов: в памяти — структурированный массив numpy
+    (строки контекста хранятся один раз, в записи только id). При превышении
+    max_in_memory старые записи дописываются в двоичный append-only файл
+    spill_path; без него — во временный файл, который удаляется вместе с
+    историей. Итерация проходит по обоим уровням.
+    Запись идёт из потока обработки, чтение (экспорт, API) — из других потоков.
+    """
+
+    def __init__(self, max_in_memory=10000, spill_path=None):
+        self.max_in_memory = max(1, max_in_memory)
+        self.spill_path = spill_path
+        self._finalizer = None
+        self.contexts = []
+        self._context_ids = {}
+        self._records = np.zeros(min(self.max_in_memory, 256), dtype=HISTORY_DTYPE)
+        self._count = 0
+        self.spilled = 0
+        self._lock = threading.RLock()
+
+        if spill_path:
+            os.makedirs(os.path.dirname(spill_path) or ".", exist_ok=True)
+            self._load_spill_index()
+
+    # --- Запись ---
+
+    def append(self, start, end, duration, context=""):
+        with self._lock:
+            self._append(start, end, duration, context)
+
+    def _append(self, start, end, duration, context):
+        if self._count == len(self._records):
+            self._make_room(1)
+        row = self._records[self._count]
+        row['start'] = start
+        row['end'] = end
+        row['duration'] = duration
+        row['context'] = self._context_id(context)
+        self._count += 1
+
+    def extend(self, starts, ends, durations, context=""):
+        """Векторное добавление (например, результата detect_intervals)"""
+        with self._lock:
+            self._extend(starts, ends, durations, context)
+
+    def _extend(self, starts, ends, durations, context):
+        count = len(starts)
+        if count == 0:
+            return
+        context_id = self._context_id(context)
+        half = self.max_in_memory // 2
+        if count > half:
+            # Большой пакет: текущие записи и голова пакета сразу уходят на диск,
+            # в памяти остаётся хвост — max_in_memory соблюдается и для больших extend()
+            direct = count - half
+            rows = np.zeros(direct, dtype=HISTORY_DTYPE)
+            rows['start'] = starts[:direct]
+            rows['end'] = ends[:direct]
+            rows['duration'] = durations[:direct]
+            rows['context'] = context_id
+            self._spill(self._count)
+            self._write_spill(rows)
+            starts, ends, durations = starts[direct:], ends[direct:], durations[direct:]
+            count = half
+            if count == 0:
+                return
+        if self._count + count > len(self._records):
+            self._make_room(count)
+        rows = self._records[self._count:self._count + count]
+        rows['start'] = starts
+        rows['end'] = ends
+        rows['duration'] = durations
+        rows['context'] = context_id
+        self._count += count
+
+    def clear(self):
+        with self._lock:
+            self._count = 0
+            self.spilled = 0
+            if self.spill_path and os.path.exists(self.spill_path):
+                open(self.spill_path, "wb").close()
+
+    # --- Чтение ---
+
+    def __len__(self):
+        return self.spilled + self._count
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __iter__(self):
+        return self.iter_from(0)
+
+    def __getitem__(self, index):
+        with self._lock:
+            if index < 0:
+                index += len(self)
+            if not 0 <= index < len(self):
+                raise IndexError(index)
+            if index >= self.spilled:
+                return self._record(self._records[index - self.spilled])
+            return self._record(self._read_spilled(index, 1)[0])
+
+    def iter_from(self, position):
+        """Записи начиная с порядкового номера position (сквозная нумерация обоих уровней)"""
+        for chunk in self.iter_arrays(position):
+            for row in chunk.tolist():
+                yield DetectionRecord(row[0], row[1], row[2], self.contexts[row[3]])
+
+    def iter_arrays(self, position=0, stop=None):
+        """Те же записи блоками HISTORY_DTYPE — для векторной обработки и экспорта; stop — до какой записи"""
+        while True:
+            with self._lock:
+                end = len(self) if stop is None else min(stop, len(self))
+                if position >= end:
+                    return
+                if position < self.spilled:
+                    chunk = self._read_spilled(position, min(_READ_CHUNK, min(self.spilled, end) - position))
+                else:
+                    chunk = self._records[position - self.spilled:end - self.spilled].copy()
+            position += len(chunk)
+            yield chunk
+
+    def snapshot(self):
+        """(копия контекстов, число записей) на один момент: экспорт до этой границы согласован"""
+        with self._lock:
+            return list(self.contexts), len(self)
+
+    def to_array(self):
+        chunks = list(self.iter_arrays())
+        return np.concatenate(chunks) if chunks else np.zeros(0, dtype=HISTORY_DTYPE)
+
+    def stats(self):
+        return {
+            'total': len(self),
+            'in_memory': self._count,
+            'spilled': self.spilled,
+            'memory_bytes': self._records.nbytes
+        }
+
+    # --- Вспомогательное ---
+
+    def _record(self, row):
+        return DetectionRecord(float(row['start']), float(row['end']), float(row['duration']),
+                               self.contexts[int(row['context'])])
+
+    def _context_id(self, context):
+        context_id = self._context_ids.get(context)
+        if context_id is None:
+            context_id = len(self.contexts)
+            self.contexts.append(context)
+            self._context_ids[context] = context_id
+            if self.spilled:
+                self._save_contexts()
+        return context_id
+
+    def _make_room(self, needed):
+        capacity = len(self._records)
+        if self._count + needed > self.max_in_memory:
+            # Старшая половина (или больше, если добавляется много) уходит на диск
+            keep = max(0, min(self._count, self.max_in_memory // 2, self.max_in_memory - needed))
+            self._spill(self._count - keep)
+        if self._count + needed > capacity:
+            new_capacity = max(min(capacity * 2, self.max_in_memory), self._count + needed)
+            records = np.zeros(new_capacity, dtype=HISTORY_DTYPE)
+            records[:self._count] = self._records[:self._count]
+            self._records = records
+
+    def _spill(self, count):
+        if count <= 0:
+            return
+        self._write_spill(self._records[:count])
+        self._records[:self._count - count] = self._records[count:self._count]
+        self._count -= count
+
+    def _write_spill(self, rows):
+        if not self.spill_path:
+            # Без spill_path лимит всё равно соблюдается — через временный файл
+            fd, self.spill_path = tempfile.mkstemp(prefix="detections_", suffix=".bin")
+            os.close(fd)
+            self._finalizer = weakref.finalize(self, _remove_files, self.spill_path, self._contexts_path)
+        self._save_contexts()
+        with open(self.spill_path, "ab") as f:
+            f.write(rows.tobytes())
+        self.spilled += len(rows)
+
+    def _read_spilled(self, position, count):
+        return np.fromfile(self.spill_path, dtype=HISTORY_DTYPE, count=count,
+                           offset=position * HISTORY_DTYPE.itemsize)
+
+    @property
+    def _contexts_path(self):
+        return self.spill_path + ".contexts.json"
+
+    def _save_contexts(self):
+        tmp_path = self._contexts_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.contexts, f, ensure_ascii=False)
+        os.replace(tmp_path, self._contexts_path)
+
+    def _load_spill_index(self):
+        """Продолжение существующего файла: число записей и словарь контекстов"""
+        if os.path.exists(self._contexts_path):
+            with open(self._contexts_path, "r", encoding="utf-8") as f:
+                self.contexts = json.load(f)
+            self._context_ids = {context: i for i, context in enumerate(self.contexts)}
+        if os.path.exists(self.spill_path):
+            self.spilled = os.path.getsize(self.spill_path) // HISTORY_DTYPE.itemsize
@@ -0,0 +1,107 @@
+# modules/export_queue.py
+import threading
+import time
+import tkinter as tk
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+class ExportJob:
+    """
+    Задание экспорта. Функция экспорта получает job и вызывает job.step(done, total)
+    между блоками данных: так передаётся прогресс и проверяется отмена.
+    """
+
+    def __init__(self, queue, name, on_progress=None, on_done=None, progress_interval=0.2):
+        self.queue = queue
+        self.name = name
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.progress_interval = progress_interval
+        self.future = None
+        self._cancel_event = threading.Event()
+        self._last_progress = 0.0
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        """Ещё не начатое задание снимается с очереди, выполняемое — останавливается на ближайшем step()"""
+        self._cancel_event.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def step(self, done, total):
+        if self._cancel_event.is_set():
+            raise ExportCancelled(self.name)
+        now = time.monotonic()
+        if self.on_progress and (now - self._last_progress >= self.progress_interval or done >= total):
+            self._last_progress = now
+            self.queue.notify(self.on_progress, self, done, total)
+
+
+class ExportQueue:
+    """
+    Фоновый исполнитель экспорта: задания выполняются по очереди в отдельном
+    потоке, результат (success, message) или ошибка передаются в поток Tk
+    через dispatch (по умолчанию root.after) — главный цикл не блокируется.
+    """
+
+    def __init__(self, root, max_workers=1, dispatch=None):
+        self.root = root
+        self.dispatch = dispatch
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="export")
+        self._jobs = []
+        self._lock = threading.Lock()
+
+    def submit(self, name, func, *args, on_progress=None, on_done=None, **kwargs):
+        """func(*args, job=job, **kwargs) → (success, message); on_done(job, success, message)"""
+        job = ExportJob(self, name, on_progress=on_progress, on_done=on_done)
+        with self._lock:
+            self._jobs.append(job)
+        job.future = self._executor.submit(self._run, job, func, args, kwargs)
+        job.future.add_done_callback(lambda future: self._finish(job, future))
+        return job
+
+    def pending(self):
+        with self._lock:
+            return [job for job in self._jobs if not job.future.done()]
+
+    def cancel_all(self):
+        for job in self.pending():
+            job.cancel()
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def notify(self, callback, *args):
+        if self.dispatch is not None:
+            self.dispatch(callback, *args)
+            return
+        try:
+            self.root.after(0, callback, *args)
+        except (RuntimeError, tk.TclError):
+            # Окно уже закрыто
+            pass
+
+    @staticmethod
+    def _run(job, func, args, kwargs):
+        if job.cancelled:
+            raise ExportCancelled(job.name)
+        return func(*args, job=job, **kwargs)
+
+    def _finish(self, job, future):
+        with self._lock:
+            self._jobs.remove(job)
+        try:
+            success, message = future.result()
+        except (CancelledError, ExportCancelled):
+            success, message = False, f"Экспорт отменён: {job.name}"
+        except Exception as e:
+            success, message = False, f"Ошибка экспорта ({job.name}): {e}"
+        if job.on_done:
+            self.notify(job.on_done, job, success, message)
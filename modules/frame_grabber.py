@@ -0,0 +1,117 @@
+# modules/frame_grabber.py
+import threading
+import time
+
+import cv2
+
+from modules.frame_pool import FramePool
+
+
+class LatestFrameGrabber:
+    """
+    Отдельный поток захвата камеры. Хранит только самый свежий кадр в одном
+    слоте под блокировкой: если обработка не успевает, старый кадр
+    перезаписывается (и учитывается как пропущенный), а не копится в буфере драйвера.
+    Кадры читаются в буферы из FramePool, поэтому в установившемся режиме
+    новые массивы не выделяются.
+    """
+
+    def __init__(self, cap, pool=None):
+        self.cap = cap
+        self.pool = pool or FramePool()
+        self._cond = threading.Condition()
+        self._frame = None
+        self._frame_id = 0
+        self._delivered_id = 0
+        self._running = False
+        self._ended = False
+        self._thread = None
+
+        self.frames_grabbed = 0
+        self.frames_delivered = 0
+        self.frames_dropped = 0
+
+        # Драйверу достаточно одного кадра в буфере — остальные только добавляют задержку
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+
+    def _capture_loop(self):
+        while self._running:
+            frame = self._grab()
+            if frame is None:
+                break
+            with self._cond:
+                stale = self._frame
+                if self._frame_id != self._delivered_id:
+                    self.frames_dropped += 1
+                self._frame = frame
+                self._frame_id += 1
+                self.frames_grabbed += 1
+                self._cond.notify_all()
+            if stale is not None:
+                stale.release()
+
+        with self._cond:
+            self._ended = True
+            stale, self._frame = self._frame, None
+            self._cond.notify_all()
+        if stale is not None:
+            stale.release()
+
+    def _grab(self):
+        if self.pool.shape is None:
+            success, image = self.cap.read()
+            return self.pool.adopt(image) if success else None
+
+        frame = self.pool.acquire(self.pool.shape)
+        success, image = self.cap.read(frame.array)
+        if not success:
+            frame.release()
+            return None
+        if image is not frame.array:
+            # Драйвер сменил разрешение — OpenCV выделил новый массив
+            frame.release()
+            return self.pool.adopt(image)
+        return frame
+
+    def read(self, timeout=1.0):
+        """
+        Возвращает (success, frame) — самый свежий ещё не выданный кадр (PooledFrame,
+        ссылка переходит вызывающему, который обязан сделать release()).
+        Ждёт не дольше timeout; success=False, если захват завершён или кадра нет.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._frame_id == self._delivered_id:
+                remaining = deadline - time.monotonic()
+                if self._ended or not self._running or remaining <= 0:
+                    return False, None
+                self._cond.wait(remaining)
+            self._delivered_id = self._frame_id
+            self.frames_delivered += 1
+            frame = self._frame
+            self._frame = None
+            return True, frame
+
+    @property
+    def is_running(self):
+        return self._running and not self._ended
+
+    def stats(self):
+        return {
+            'grabbed': self.frames_grabbed,
+            'delivered': self.frames_delivered,
+            'dropped': self.frames_dropped
+        }
@@ -0,0 +1,111 @@
+# modules/frame_pool.py
+import threading
+
+import numpy as np
+
+
+class PooledFrame:
+    """
+    Кадр из пула с подсчётом ссылок. Пока есть хотя бы одна ссылка, буфер
+    не переиспользуется; потребители получают read-only view, а копию
+    делают только те, кому она действительно нужна (скриншот, экспорт).
+    """
+
+    __slots__ = ("pool", "array", "_refs")
+
+    def __init__(self, pool, array):
+        self.pool = pool
+        self.array = array
+        self._refs = 1
+
+    def retain(self):
+        with self.pool.lock:
+            self._refs += 1
+        return self
+
+    def release(self):
+        with self.pool.lock:
+            self._refs -= 1
+            if self._refs > 0:
+                return
+        self.pool.recycle(self)
+
+    def view(self):
+        view = self.array.view()
+        view.flags.writeable = False
+        return view
+
+    def copy(self):
+        return self.array.copy()
+
+    @property
+    def shape(self):
+        return self.array.shape
+
+
+class FramePool:
+    """Кольцо заранее выделенных буферов одного размера; при нехватке буфер выделяется заново"""
+
+    def __init__(self, max_free=4, dtype=np.uint8):
+        self.max_free = max_free
+        self.dtype = dtype
+        self.lock = threading.Lock()
+        self.shape = None
+        self._free = []
+        self.allocations = 0
+
+    def acquire(self, shape):
+        shape = tuple(shape)
+        with self.lock:
+            if shape != self.shape:
+                # Разрешение изменилось — старые буферы больше не подходят
+                self.shape = shape
+                self._free.clear()
+            if self._free:
+                array = self._free.pop()
+            else:
+                array = None
+                self.allocations += 1
+        if array is None:
+            # Само выделение — вне блокировки, счётчик уже учтён
+            array = np.empty(shape, dtype=self.dtype)
+        return PooledFrame(self, array)
+
+    def adopt(self, array):
+        """Берёт уже выделенный массив под управление пула"""
+        with self.lock:
+            if array.shape != self.shape:
+                self.shape = array.shape
+                self._free.clear()
+            self.allocations += 1
+        return PooledFrame(self, array)
+
+    def recycle(self, frame):
+        with self.lock:
+            if frame.array.shape == self.shape and len(self._free) < self.max_free:
+                self._free.append(frame.array)
+
+
+class FrameSlot:
+    """Потокобезопасная ссылка на последний кадр (сырой или с наложением)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._frame = None
+
+    def set(self, frame):
+        """Забирает ссылку frame себе и освобождает предыдущую"""
+        with self._lock:
+            previous, self._frame = self._frame, frame
+        if previous is not None:
+            previous.release()
+
+    def copy(self):
+        with self._lock:
+            return self._frame.copy() if self._frame is not None else None
+
+    def clear(self):
+        self.set(None)
+
+    def __bool__(self):
+        return self._frame is not None
@@ -1,57 +1,233 @@
 import cv2
+import numpy as np
 import os
 from datetime import datetime
 import time
 
+from modules.detection_history import DetectionHistory, format_time
+
+# Интервал присутствия в компактном виде: время (epoch, сек) и кадры [start_frame, end_frame)
+INTERVAL_DTYPE = np.dtype([
+    ('start', '<f8'),
+    ('end', '<f8'),
+    ('duration', '<f8'),
+    ('start_frame', '<i8'),
+    ('end_frame', '<i8'),
+])
+
+
+def frame_timestamps(count, fps, start=0.0):
+    """Время кадров по таймлайну видео"""
+    return start + np.arange(count, dtype=np.float64) / fps
+
+
+def presence_weights(presence, confidence=None, enter_frames=1, min_confidence=0.0):
+    """
+    Присутствие и вес кадров так же, как в HumanDetector.update: кадр засчитан,
+    если уверенность не ниже min_confidence; при входе (enter_frames > 1)
+    кадр весит свою уверенность, иначе — 1.
+    """
+    presence = np.asarray(presence, dtype=bool)
+    if confidence is None:
+        confidence = presence.astype(np.float64)
+    else:
+        confidence = np.asarray(confidence, dtype=np.float64)
+    present = presence & (confidence >= min_confidence)
+    weights = np.where(present & (enter_frames > 1), confidence, 1.0)
+    return present, weights
+
+
+def detect_intervals(presence, timestamps, enter_frames=1, exit_frames=1, enter_sec=0.0, exit_sec=0.0,
+                     min_confidence=0.0, confidence=None, end_time=None, min_duration=0.0):
+    """
+    Интервалы присутствия за один векторный проход с тем же гистерезисом,
+    что у HumanDetector (результат совпадает с покадровым update() + close()).
+
+    Подтверждение смены состояния всегда начинается с первого кадра серии
+    одинаковых флагов, а счёт и время внутри серии только растут — поэтому
+    серия переключает состояние, только если порог достигнут к её последнему
+    кадру. Из таких серий засчитываются те, что чередуются по значению
+    (вход, выход, вход, ...); начало/конец интервала — время первого кадра серии.
+    end_time — время закрытия интервала, открытого в конце (по умолчанию
+    время последнего кадра плюс шаг таймлайна). Пропуски короче exit_sec / exit_frames
+    склеиваются гистерезисом; уже после него интервалы короче min_duration сек отбрасываются.
+    """
+    present, weights = presence_weights(presence, confidence, enter_frames, min_confidence)
+    timestamps = np.asarray(timestamps, dtype=np.float64)[:len(present)]
+    if len(present) == 0:
+        return np.zeros(0, dtype=INTERVAL_DTYPE)
+
+    # Серии одинаковых флагов: начало, конец (включительно) и значение
+    run_starts = np.flatnonzero(np.diff(present.astype(np.int8), prepend=np.int8(not present[0])))
+    run_ends = np.append(run_starts[1:], len(present)) - 1
+    values = present[run_starts]
+
+    # Сумма по каждой серии отдельно (не разность накопленных сумм — без потери точности на длинных записях)
+    scores = np.add.reduceat(weights, run_starts)
+    spans = timestamps[run_ends] - timestamps[run_starts]
+    need_frames = np.where(values, enter_frames, exit_frames)
+    need_sec = np.where(values, enter_sec, exit_sec)
+    qualified = np.flatnonzero((scores >= need_frames) & (spans >= need_sec))
+
+    # Засчитываются только серии, меняющие состояние: первая — вход, дальше по очереди
+    qualified_values = values[qualified]
+    switches = qualified[qualified_values != np.concatenate(([False], qualified_values[:-1]))]
+    enters = switches[values[switches]]
+    exits = switches[~values[switches]]
+
+    starts = run_starts[enters]
+    ends = run_starts[exits]
+    if len(starts) > len(ends):
+        # Интервал открыт до конца: если в конце шло неподтверждённое отсутствие — закрываем на его начале
+        if not values[-1]:
+            ends = np.append(ends, run_starts[-1])
+            end_bounds = timestamps[ends]
+        else:
+            if end_time is None:
+                step = float(np.median(np.diff(timestamps))) if len(timestamps) > 1 else 0.0
+                end_time = float(timestamps[-1]) + step
+            end_bounds = np.append(timestamps[ends], end_time)
+            ends = np.append(ends, len(present))
+    else:
+        end_bounds = timestamps[ends]
+
+    intervals = np.zeros(len(starts), dtype=INTERVAL_DTYPE)
+    intervals['start'] = timestamps[starts]
+    intervals['end'] = end_bounds
+    intervals['duration'] = intervals['end'] - intervals['start']
+    intervals['start_frame'] = starts
+    intervals['end_frame'] = ends
+    if min_duration > 0:
+        intervals = intervals[intervals['duration'] >= min_duration]
+    return intervals
+
+
+# Рекомендуемый гистерезис для приложения; сам HumanDetector по умолчанию без него
+DEFAULT_DETECTOR_SETTINGS = {
+    "enter_frames": 3,
+    "exit_frames": 5,
+    "enter_sec": 0.0,
+    "exit_sec": 0.5,
+    "min_confidence": 0.0
+}
+
+
+def detector_kwargs_from_settings(settings):
+    """Параметры гистерезиса из секции "detector" settings.json"""
+    kwargs = dict(DEFAULT_DETECTOR_SETTINGS)
+    kwargs.update({k: v for k, v in (settings.get("detector") or {}).items() if k in kwargs})
+    return kwargs
+
+
 class HumanDetector:
-    def __init__(self, log_callback=None, log_action_callback=None, screenshot_dir="screenshots", autoscreenshot=False):
+    """
+    Интервалы присутствия человека в кадре с гистерезисом: вход засчитывается,
+    когда сумма уверенности кадров подряд наберёт enter_frames и пройдёт enter_sec,
+    выход — после exit_frames кадров / exit_sec без человека. Одиночные
+    пропуски детекции не рвут интервал и не порождают лишние логи и скриншоты.
+    """
+
+    def __init__(self, log_callback=None, log_action_callback=None, screenshot_dir="screenshots", autoscreenshot=False,
+                 enter_frames=1, exit_frames=1, enter_sec=0.0, exit_sec=0.0, min_confidence=0.0, history=None,
+                 screenshot_service=None):
         self.log_callback = log_callback
         self.log_action_callback = log_action_callback
         self.screenshot_dir = screenshot_dir
         self.autoscreenshot = autoscreenshot
+        # Без сервиса автоскриншот пишется синхронно в потоке update()
+        self.screenshot_service = screenshot_service
+        self.enter_frames = enter_frames
+        self.exit_frames = exit_frames
+        self.enter_sec = enter_sec
+        self.exit_sec = exit_sec
+        self.min_confidence = min_confidence
         self.is_detected = False
-        self.detection_history = []
-        self.current_frame = None
+        self.detection_history = history if history is not None else DetectionHistory()
         self.current_frame_num = None
         self.detection_start_time = None
         self.last_detection_time = None
         self.current_detection_duration = 0.0
         self.has_pose_landmarks = False
+        self._pending_since = None
+        self._pending_score = 0.0
+
+    @property
+    def is_pending(self):
+        """Идёт подтверждение входа или выхода — кадры пропускать нельзя"""
+        return self._pending_since is not None
+
+    def hysteresis(self):
+        """Текущие параметры гистерезиса — в форме аргументов detect_intervals"""
+        return {key: getattr(self, key) for key in DEFAULT_DETECTOR_SETTINGS}
+
+    def update(self, has_pose_landmarks=False, context="", current_frame=None, frame_num=None, timestamp=None,
+               confidence=None):
+        # timestamp — время кадра (epoch, сек); для видео передаётся время по таймлайну
+        # confidence — уверенность детекции 0..1 (например, средняя visibility landmarks)
+        # current_frame — read-only view буфера из пула: нужен только автоскриншоту (он делает копию),
+        # ссылка не сохраняется — после update() буфер может вернуться в пул
+        now = time.time() if timestamp is None else timestamp
+        if confidence is None:
+            confidence = 1.0 if has_pose_landmarks else 0.0
+        present = has_pose_landmarks and confidence >= self.min_confidence
+        self.has_pose_landmarks = present
 
-    def update(self, has_pose_landmarks=False, context="", current_frame=None, frame_num=None):
-        self.has_pose_landmarks = has_pose_landmarks
-
-        if has_pose_landmarks:
-            if not self.is_detected:
-                self.is_detected = True
-                self.detection_start_time = time.time()
-                self.last_detection_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                if self.log_callback:
-                    self.log_callback(f"Человек обнаружен ({context})", "SUCCESS")
-                if self.autoscreenshot and current_frame is not None:
-                    self._save_screenshot(current_frame, "auto_detect")
-            else:
-                self.current_detection_duration = time.time() - self.detection_start_time
+        if present != self.is_detected:
+            # Кадр «против» текущего состояния: копим счёт до переключения
+            if self._pending_since is None:
+                self._pending_since = now
+                self._pending_score = 0.0
+            # При входе кадры весятся уверенностью: слабые детекции подтверждаются дольше
+            self._pending_score += confidence if present and self.enter_frames > 1 else 1.0
+            frames, window = (self.enter_frames, self.enter_sec) if present else (self.exit_frames, self.exit_sec)
+            if self._pending_score >= frames and now - self._pending_since >= window:
+                # Начало/конец интервала — время первого кадра серии
+                switched_at = self._pending_since
+                self._pending_since = None
+                if present:
+                    self._enter(switched_at, context, current_frame)
+                else:
+                    self._exit(switched_at, context)
         else:
-            if self.is_detected:
-                duration = time.time() - self.detection_start_time
-                self.detection_history.append({
-                    'start_time': self.last_detection_time,
-                    'end_time': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    'duration': duration,
-                    'context': context
-                })
-                self.is_detected = False
-                if self.log_callback:
-                    self.log_callback(f"Человек покинул кадр ({context}) — длительность: {duration:.1f} сек", "INFO")
-
-        if current_frame is not None:
-            self.current_frame = current_frame.copy()
+            self._pending_since = None
+
+        if self.is_detected:
+            self.current_detection_duration = now - self.detection_start_time
 
         if frame_num is not None:
             self.current_frame_num = frame_num
 
+    def _enter(self, start, context, current_frame):
+        self.is_detected = True
+        self.detection_start_time = start
+        self.last_detection_time = self._format_time(start)
+        if self.log_callback:
+            self.log_callback(f"Человек обнаружен ({context})", "SUCCESS")
+        if self.autoscreenshot and current_frame is not None:
+            self._save_screenshot(current_frame, "auto_detect")
+
+    def _exit(self, end, context):
+        duration = end - self.detection_start_time
+        self.detection_history.append(self.detection_start_time, end, duration, context)
+        self.is_detected = False
+        if self.log_callback:
+            self.log_callback(f"Человек покинул кадр ({context}) — длительность: {duration:.1f} сек", "INFO")
+
+    def close(self, context="", timestamp=None):
+        """Закрывает открытый интервал (конец видео/остановка камеры)"""
+        if self.is_detected:
+            now = time.time() if timestamp is None else timestamp
+            self._exit(self._pending_since if self._pending_since is not None else now, context)
+        self._pending_since = None
+
+    @staticmethod
+    def _format_time(ts):
+        return format_time(ts)
+
     def _save_screenshot(self, frame, prefix):
+        if self.screenshot_service is not None:
+            self.screenshot_service.save(frame, prefix, on_done=self._on_screenshot_saved)
+            return
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"{prefix}_{timestamp}.jpg"
         filepath = os.path.join(self.screenshot_dir, filename)
@@ -61,8 +237,26 @@ class HumanDetector:
         elif self.log_callback and not success:
             self.log_callback(f"❌ Не удалось сохранить автоскриншот: {filepath}", "ERROR")
 
+    def _on_screenshot_saved(self, filepath, success):
+        if self.log_callback and success:
+            self.log_callback(f"📸 Автоскриншот: {filepath}", "SUCCESS")
+        elif self.log_callback and not success:
+            self.log_callback(f"❌ Не удалось сохранить автоскриншот: {filepath}", "ERROR")
+
+    def add_intervals(self, intervals, context=""):
+        """Добавляет в историю интервалы из detect_intervals (вместо покадрового update() + close())"""
+        self.detection_history.extend(intervals['start'], intervals['end'], intervals['duration'], context)
+        self.is_detected = False
+        self._pending_since = None
+        if len(intervals):
+            self.last_detection_time = self._format_time(float(intervals['start'][-1]))
+        if self.log_callback:
+            total = float(intervals['duration'].sum()) if len(intervals) else 0.0
+            self.log_callback(f"Интервалов присутствия ({context}): {len(intervals)}, всего {total:.1f} сек", "INFO")
+
     def reset(self):
         self.is_detected = False
+        self._pending_since = None
         self.detection_start_time = None
         self.current_detection_duration = 0.0
         self.has_pose_landmarks = False
\ No newline at end of file
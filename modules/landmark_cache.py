@@ -0,0 +1,200 @@
+# modules/landmark_cache.py
+"""
+Дисковый кэш landmarks: ключ — хэш содержимого видео + параметры модели Pose.
+Повторная обработка того же файла пропускает инференс и только перерисовывает
+наложение. Размер кэша ограничен, вытесняются давно не использованные записи.
+
+    python -m modules.landmark_cache list
+    python -m modules.landmark_cache prune --max-mb 1024
+    python -m modules.landmark_cache clear
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+
+import numpy as np
+
+from modules.landmark_recorder import LandmarkRecorder, iter_segments, read_meta
+from modules.pose_engine import array_to_landmarks
+
+DEFAULT_CACHE_DIR = "landmark_cache"
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+
+def file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(video_path, pose_kwargs):
+    params = json.dumps(pose_kwargs, sort_keys=True)
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(file_digest(video_path).encode())
+    digest.update(params.encode())
+    return digest.hexdigest()
+
+
+def _dir_size(path):
+    total = 0
+    for entry in os.scandir(path):
+        if entry.is_file():
+            total += entry.stat().st_size
+    return total
+
+
+class CachedLandmarks:
+    """
+    Источник landmarks для VideoPipeline: кадр → NormalizedLandmarkList или None.
+    Сегменты записи открываются через mmap и не склеиваются: в памяти только
+    смещения сегментов, кадр читается с диска по обращению.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.segments = list(iter_segments(path, mmap=True))
+        # offsets[i] — номер первого кадра сегмента i; последний элемент — всего кадров
+        self.offsets = np.cumsum([0] + [len(segment) for segment in self.segments])
+        self.meta = read_meta(path)
+        self._current = 0
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def __call__(self, frame_num):
+        if frame_num < 0 or frame_num >= len(self):
+            return None
+        index = self._current
+        # Кадры идут по порядку — обычно это тот же сегмент, что и в прошлый раз
+        if not self.offsets[index] <= frame_num < self.offsets[index + 1]:
+            index = int(np.searchsorted(self.offsets, frame_num, side='right')) - 1
+            self._current = index
+        record = self.segments[index][frame_num - self.offsets[index]]
+        if not record['present']:
+            return None
+        return array_to_landmarks(record['landmarks'])
+
+
+class LandmarkCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def lookup(self, key):
+        """CachedLandmarks при попадании (и отметка об использовании), иначе None"""
+        path = self._entry_path(key)
+        if not os.path.isdir(path):
+            return None
+        try:
+            os.utime(path)
+            return CachedLandmarks(path)
+        except OSError:
+            return None
+
+    def writer(self, key, fps=None, meta=None):
+        """Запись новой записи во временный каталог; commit() делает её видимой"""
+        tmp_path = os.path.join(self.cache_dir, f".{key}.{uuid.uuid4().hex}.tmp")
+        meta = dict(meta or {})
+        meta['key'] = key
+        return LandmarkRecorder(tmp_path, fps=fps, meta=meta)
+
+    def commit(self, key, recorder):
+        recorder.close()
+        path = self._entry_path(key)
+        try:
+            os.replace(recorder.path, path)
+        except OSError:
+            # Ту же запись уже положил параллельный процесс
+            shutil.rmtree(recorder.path, ignore_errors=True)
+        self.prune()
+        return path
+
+    def discard(self, recorder):
+        try:
+            recorder.close()
+        finally:
+            shutil.rmtree(recorder.path, ignore_errors=True)
+
+    def entries(self):
+        """Записи кэша от давно использованных к недавним"""
+        result = []
+        for entry in os.scandir(self.cache_dir):
+            if not entry.is_dir() or entry.name.startswith("."):
+                continue
+            try:
+                meta = read_meta(entry.path)
+                result.append({
+                    'key': entry.name,
+                    'size': _dir_size(entry.path),
+                    'last_used': entry.stat().st_mtime,
+                    'source': meta.get('source'),
+                    'frames': meta.get('frames')
+                })
+            except OSError:
+                continue
+        result.sort(key=lambda e: e['last_used'])
+        return result
+
+    def stats(self):
+        entries = self.entries()
+        return {
+            'entries': len(entries),
+            'size_bytes': sum(e['size'] for e in entries),
+            'max_bytes': self.max_bytes
+        }
+
+    def prune(self, max_bytes=None):
+        """Вытесняет записи по LRU, пока кэш не уложится в лимит; возвращает число удалённых"""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = self.entries()
+        total = sum(e['size'] for e in entries)
+        removed = 0
+        for entry in entries:
+            if total <= limit:
+                break
+            shutil.rmtree(self._entry_path(entry['key']), ignore_errors=True)
+            total -= entry['size']
+            removed += 1
+        return removed
+
+    def clear(self):
+        return self.prune(max_bytes=0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Кэш landmarks MediaPipe Pose")
+    parser.add_argument("command", choices=("list", "prune", "clear"))
+    parser.add_argument("--dir", default=DEFAULT_CACHE_DIR, help="каталог кэша")
+    parser.add_argument("--max-mb", type=float, help="лимит размера для prune (МБ)")
+    args = parser.parse_args(argv)
+
+    cache = LandmarkCache(args.dir)
+    if args.command == "list":
+        for entry in reversed(cache.entries()):
+            last_used = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry['last_used']))
+            print(f"{entry['key']}  {entry['size'] / 1024 ** 2:8.1f} МБ  {last_used}  "
+                  f"{entry['frames']} кадров  {entry['source']}")
+        stats = cache.stats()
+        print(f"Всего: {stats['entries']} записей, {stats['size_bytes'] / 1024 ** 2:.1f} МБ")
+    elif args.command == "prune":
+        max_bytes = int(args.max_mb * 1024 ** 2) if args.max_mb is not None else None
+        print(f"Удалено записей: {cache.prune(max_bytes)}")
+    else:
+        print(f"Удалено записей: {cache.clear()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+# modules/landmark_recorder.py
+import glob
+import json
+import os
+import queue
+import threading
+
+import numpy as np
+
+NUM_LANDMARKS = 33
+
+# Одна запись на кадр: номер, время (сек), найден ли человек и 33 × (x, y, z, visibility)
+LANDMARK_DTYPE = np.dtype([
+    ('frame', '<i8'),
+    ('timestamp', '<f8'),
+    ('present', '?'),
+    ('landmarks', '<f4', (NUM_LANDMARKS, 4)),
+])
+
+META_NAME = "meta.json"
+SEGMENT_PATTERN = "segment_*.npy"
+
+
+def landmarks_to_array(landmarks, out=None):
+    """NormalizedLandmarkList → массив (33, 4); без landmarks — нули"""
+    if out is None:
+        out = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+    if not landmarks:
+        out[:] = 0
+        return out
+    for i, lm in enumerate(landmarks.landmark[:NUM_LANDMARKS]):
+        out[i, 0] = lm.x
+        out[i, 1] = lm.y
+        out[i, 2] = lm.z
+        out[i, 3] = lm.visibility
+    return out
+
+
+class LandmarkRecorder:
+    """
+    Покадровая запись landmarks в каталог сессии. Записи копятся в заранее
+    выделенном структурированном массиве и сбрасываются сегментами .npy
+    (их можно открыть через np.load(..., mmap_mode='r') без чтения в память).
+    Запись на диск идёт в фоновом потоке, буферы переиспользуются.
+    """
+
+    def __init__(self, path, chunk_size=1800, fps=None, meta=None):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.fps = fps
+        self.meta = dict(meta or {})
+        os.makedirs(self.path, exist_ok=True)
+
+        self._buffer = np.zeros(chunk_size, dtype=LANDMARK_DTYPE)
+        self._spare = queue.Queue()
+        self._spare.put(np.zeros(chunk_size, dtype=LANDMARK_DTYPE))
+        self._count = 0
+        self._segment_index = 0
+        self.frames_recorded = 0
+        self._lock = threading.Lock()
+        self._write_queue = queue.Queue()
+        self._error = None
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def record(self, frame_num, landmarks, timestamp=None):
+        if timestamp is None:
+            timestamp = frame_num / self.fps if self.fps else 0.0
+        with self._lock:
+            row = self._buffer[self._count]
+            row['frame'] = frame_num
+            row['timestamp'] = timestamp
+            row['present'] = bool(landmarks)
+            landmarks_to_array(landmarks, out=row['landmarks'])
+            self._count += 1
+            self.frames_recorded += 1
+            if self._count == self.chunk_size:
+                self._flush_locked()
+
+    def extend(self, records):
+        """Готовые записи LANDMARK_DTYPE по порядку кадров (например, от процессов параллельной обработки)"""
+        with self._lock:
+            position = 0
+            while position < len(records):
+                count = min(self.chunk_size - self._count, len(records) - position)
+                self._buffer[self._count:self._count + count] = records[position:position + count]
+                self._count += count
+                self.frames_recorded += count
+                position += count
+                if self._count == self.chunk_size:
+                    self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self._count == 0:
+            return
+        path = os.path.join(self.path, f"segment_{self._segment_index:05d}.npy")
+        self._write_queue.put((path, self._buffer, self._count))
+        self._segment_index += 1
+        # Пока заполненный буфер пишется на диск, заполняем свободный
+        self._buffer = self._spare.get()
+        self._count = 0
+
+    def _write_loop(self):
+        while True:
+            item = self._write_queue.get()
+            if item is None:
+                break
+            path, buffer, count = item
+            try:
+                np.save(path, buffer[:count])
+            except Exception as e:
+                self._error = e
+            self._spare.put(buffer)
+
+    def close(self):
+        self.flush()
+        self._write_queue.put(None)
+        self._writer.join()
+        meta = dict(self.meta)
+        meta.update({
+            'fps': self.fps,
+            'frames': self.frames_recorded,
+            'segments': self._segment_index,
+            'num_landmarks': NUM_LANDMARKS
+        })
+        with open(os.path.join(self.path, META_NAME), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2, ensure_ascii=False)
+        if self._error is not None:
+            raise self._error
+        return meta
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_meta(path):
+    meta_path = os.path.join(path, META_NAME)
+    if not os.path.exists(meta_path):
+        return {}
+    with open(meta_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def iter_segments(path, mmap=True):
+    """Сегменты записи по порядку (memory-mapped, если mmap=True)"""
+    for segment_path in sorted(glob.glob(os.path.join(path, SEGMENT_PATTERN))):
+        yield np.load(segment_path, mmap_mode='r' if mmap else None)
+
+
+def load_recording(path):
+    """Вся запись одним структурированным массивом"""
+    segments = list(iter_segments(path))
+    if not segments:
+        return np.zeros(0, dtype=LANDMARK_DTYPE)
+    return np.concatenate(segments)
@@ -0,0 +1,110 @@
+# modules/landmark_replay.py
+"""
+Повторный расчёт интервалов присутствия по записанным landmarks — без
+декодирования видео и без инференса. И присутствие, и интервалы (с гистерезисом
+HumanDetector) считаются векторно по всей записи, поэтому одна запись
+прогоняется под разными параметрами за доли секунды.
+
+    python -m modules.landmark_replay recordings/webcam_20250101_120000 \\
+        --min-visibility 0.3 0.5 0.7 --min-landmarks 1 5 10
+"""
+import argparse
+import itertools
+import time
+
+import numpy as np
+
+from modules.human_detector import HumanDetector, DEFAULT_DETECTOR_SETTINGS, detect_intervals
+from modules.landmark_recorder import load_recording, read_meta
+
+# Всё, что меньше, — время от начала видео, а не epoch
+_EPOCH_THRESHOLD = 1e9
+
+
+def presence_from_landmarks(records, min_visibility=0.0, min_landmarks=1):
+    """Флаги присутствия по записи: кадр засчитан, если видно не меньше min_landmarks точек"""
+    present = records['present']
+    if min_visibility <= 0 and min_landmarks <= 1:
+        return present.copy()
+    visible = np.count_nonzero(records['landmarks'][..., 3] >= min_visibility, axis=1)
+    return present & (visible >= min_landmarks)
+
+
+def replay_presence(human_detector, presence, timestamps, context="запись", end_time=None, confidence=None):
+    """
+    Интервалы по флагам присутствия за один векторный проход detect_intervals
+    с гистерезисом детектора — то же, что покадровые update() + close(), но без
+    цикла по кадрам. Открытый в конце интервал закрывается на end_time
+    (по умолчанию — следующий кадр). Возвращает массив интервалов.
+    """
+    if len(presence) == 0:
+        return None
+    intervals = detect_intervals(presence, timestamps, confidence=confidence, end_time=end_time,
+                                 **human_detector.hysteresis())
+    human_detector.add_intervals(intervals, context)
+    return intervals
+
+
+def recording_confidence(records):
+    """Средняя visibility по кадрам записи (векторно)"""
+    return records['landmarks'][..., 3].mean(axis=1) * records['present']
+
+
+def recording_timestamps(records, base_time=None):
+    """Время кадров (epoch); у записей видео время относительное и сдвигается на base_time"""
+    timestamps = records['timestamp'].astype(np.float64)
+    if len(timestamps) and timestamps[0] < _EPOCH_THRESHOLD:
+        timestamps = timestamps + (time.time() if base_time is None else base_time)
+    return timestamps
+
+
+def replay_recording(path, human_detector, context="запись", base_time=None, **presence_kwargs):
+    records = load_recording(path)
+    replay_presence(human_detector, presence_from_landmarks(records, **presence_kwargs),
+                    recording_timestamps(records, base_time), context=context,
+                    confidence=recording_confidence(records))
+    return human_detector.detection_history
+
+
+def sweep(path, param_sets, context="запись"):
+    """
+    Интервалы для каждого набора параметров; запись читается один раз (mmap).
+    В наборе могут быть и параметры присутствия, и гистерезис HumanDetector.
+    """
+    records = load_recording(path)
+    timestamps = recording_timestamps(records)
+    confidence = recording_confidence(records)
+    results = []
+    for params in param_sets:
+        detector = HumanDetector(**{k: v for k, v in params.items() if k in DEFAULT_DETECTOR_SETTINGS})
+        presence_params = {k: v for k, v in params.items() if k not in DEFAULT_DETECTOR_SETTINGS}
+        replay_presence(detector, presence_from_landmarks(records, **presence_params), timestamps,
+                        context=context, confidence=confidence)
+        results.append((params, detector.detection_history))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Пересчёт интервалов по записи landmarks")
+    parser.add_argument("path", help="каталог записи (recordings/...) или запись кэша")
+    parser.add_argument("--min-visibility", type=float, nargs="+", default=[0.0])
+    parser.add_argument("--min-landmarks", type=int, nargs="+", default=[1])
+    args = parser.parse_args(argv)
+
+    param_sets = [{'min_visibility': v, 'min_landmarks': n}
+                  for v, n in itertools.product(args.min_visibility, args.min_landmarks)]
+    started = time.perf_counter()
+    results = sweep(args.path, param_sets)
+    elapsed = time.perf_counter() - started
+
+    meta = read_meta(args.path)
+    print(f"Запись: {args.path} ({meta.get('frames', '?')} кадров)")
+    for params, history in results:
+        total = sum(item['duration'] for item in history)
+        print(f"visibility ≥ {params['min_visibility']:.2f}, точек ≥ {params['min_landmarks']:2d}: "
+              f"{len(history)} интервалов, {total:.1f} сек присутствия")
+    print(f"Наборов параметров: {len(results)} за {elapsed:.3f} с")
+
+
+if __name__ == "__main__":
+    main()
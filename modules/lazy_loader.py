@@ -0,0 +1,43 @@
+# modules/lazy_loader.py
+import threading
+import time
+
+
+class BackgroundLoader:
+    """
+    Выполняет тяжёлые шаги запуска (импорт mediapipe/matplotlib, прогрев модели)
+    в фоновом потоке, пока окно уже отображается. Прогресс и результат
+    передаются в главный поток Tk только через dispatch(callback, *args) —
+    root.after из фонового потока вызывать нельзя.
+    """
+
+    def __init__(self, steps, dispatch, on_progress=None, on_done=None):
+        self.dispatch = dispatch
+        self.steps = steps
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.timings = {}
+        self.errors = {}
+        self.is_done = False
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+        return self
+
+    def _run(self):
+        total = len(self.steps)
+        for index, (title, step) in enumerate(self.steps):
+            self._notify(self.on_progress, title, int(index / total * 100))
+            started = time.perf_counter()
+            try:
+                step()
+            except Exception as e:
+                self.errors[title] = e
+            self.timings[title] = time.perf_counter() - started
+
+        self.is_done = True
+        self._notify(self.on_done, self.errors)
+
+    def _notify(self, callback, *args):
+        if callback is not None:
+            self.dispatch(callback, *args)
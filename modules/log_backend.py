@@ -0,0 +1,284 @@
+# modules/log_backend.py
+import datetime
+import json
+import logging
+import os
+import sys
+import threading
+
+SUCCESS = 25
+logging.addLevelName(SUCCESS, "SUCCESS")
+
+# Уровни лог-панели GUI → уровни logging
+LEVELS = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "SUCCESS": SUCCESS,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR
+}
+
+
+class BufferedFileWriter:
+    """
+    Запись строк в файл из фонового потока: write() только кладёт строку
+    в буфер памяти, поток сбрасывает его одним write() раз в flush_interval
+    секунд или сразу, как набралось flush_lines строк. Файл держится открытым
+    и ротируется по размеру (path → path.1 → ... → path.backup_count).
+    """
+
+    def __init__(self, path, max_bytes=10 * 1024 ** 2, backup_count=3, flush_interval=1.0,
+                 flush_lines=256, max_buffer_lines=100000):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.flush_interval = flush_interval
+        self.flush_lines = flush_lines
+        self.max_buffer_lines = max_buffer_lines
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self.written = 0
+        self.dropped = 0
+        self.rotations = 0
+        self.errors = 0
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._file = None
+        self._size = 0
+        self._open()
+
+        self._thread = threading.Thread(target=self._loop, name=f"log-writer:{os.path.basename(path)}", daemon=True)
+        self._thread.start()
+
+    def write(self, line):
+        with self._lock:
+            if len(self._buffer) >= self.max_buffer_lines:
+                # Диск не успевает: лучше потерять строку, чем память
+                self.dropped += 1
+                return
+            self._buffer.append(line)
+            pending = len(self._buffer)
+        if pending >= self.flush_lines:
+            self._wakeup.set()
+
+    def flush(self):
+        """Синхронный сброс буфера — например, перед чтением файла. Ошибки записи не пробрасываются"""
+        try:
+            self._drain()
+        except Exception as e:
+            self._report_error(e)
+            return False
+        return True
+
+    def stats(self):
+        with self._lock:
+            return {
+                'path': self.path,
+                'buffered': len(self._buffer),
+                'written': self.written,
+                'dropped': self.dropped,
+                'rotations': self.rotations,
+                'errors': self.errors,
+                'size_bytes': self._size
+            }
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._thread.join()
+        self.flush()
+        with self._write_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _loop(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self._drain()
+            except Exception as e:
+                # Поток записи не должен умирать: строки остались в буфере, попробуем на следующем тике
+                self._report_error(e)
+
+    def _drain(self):
+        with self._write_lock:
+            with self._lock:
+                lines, self._buffer = self._buffer, []
+            if not lines:
+                return
+            data = "\n".join(lines) + "\n"
+            try:
+                if self._file is None:
+                    self._open()
+                self._file.write(data)
+                self._file.flush()
+            except Exception:
+                self._requeue(lines)
+                raise
+            self._size += len(data.encode("utf-8"))
+            self.written += len(lines)
+            if self.max_bytes and self._size >= self.max_bytes:
+                self._rotate()
+
+    def _requeue(self, lines):
+        """Возвращает незаписанные строки в начало буфера; сверх лимита самые старые теряются"""
+        with self._lock:
+            buffer = lines + self._buffer
+            overflow = len(buffer) - self.max_buffer_lines
+            if overflow > 0:
+                self.dropped += overflow
+                buffer = buffer[overflow:]
+            self._buffer = buffer
+
+    def _report_error(self, error):
+        # Не через logging: ошибка самого лога не должна снова попасть в этот же буфер
+        with self._lock:
+            self.errors += 1
+        sys.stderr.write(f"❌ Ошибка записи лога {self.path}: {error}\n")
+
+    def _open(self):
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._size = os.path.getsize(self.path)
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        try:
+            if self.backup_count > 0:
+                for index in range(self.backup_count - 1, 0, -1):
+                    source = f"{self.path}.{index}"
+                    if os.path.exists(source):
+                        os.replace(source, f"{self.path}.{index + 1}")
+                os.replace(self.path, f"{self.path}.1")
+            else:
+                os.remove(self.path)
+            self.rotations += 1
+        finally:
+            # Даже если переименование не удалось (файл занят), пишем дальше в текущий файл;
+            # если не открылся и он — _drain() попробует снова на следующей записи
+            self._open()
+
+
+class BufferedHandler(logging.Handler):
+    """logging.Handler поверх BufferedFileWriter: форматирование в потоке вызова, запись — в фоне"""
+
+    def __init__(self, writer, level=logging.NOTSET):
+        super().__init__(level)
+        self.writer = writer
+
+    def emit(self, record):
+        try:
+            self.writer.write(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        self.writer.flush()
+
+    def close(self):
+        self.writer.close()
+        super().close()
+
+
+class CallbackHandler(logging.Handler):
+    """Передаёт запись в callback(message, level) — так к logging подключается лог-панель GUI"""
+
+    def __init__(self, callback, level=logging.NOTSET):
+        super().__init__(level)
+        self.callback = callback
+
+    def emit(self, record):
+        try:
+            self.callback(self.format(record), record.levelname)
+        except Exception:
+            self.handleError(record)
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Одна запись — одна строка JSON; поля из extra={'data': {...}} попадают в объект как есть"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName
+        }
+        data = getattr(record, 'data', None)
+        if data:
+            entry.update(data)
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class LogBackend:
+    """
+    Логирование приложения на стандартном logging:
+      <name>.actions — журнал действий (logs.txt, прежний формат "[дата] действие");
+      <name>.errors  — ошибки с трассировкой (errors.log);
+      <name>.ui      — сообщения лог-панели (сама панель — ещё один handler, add_handler).
+    Все записи дополнительно пишутся в JSON Lines (jsonl_file), если он задан.
+    """
+
+    def __init__(self, name="skeleton_tracker", log_file="logs.txt", error_log="errors.log",
+                 jsonl_file=None, max_bytes=10 * 1024 ** 2, backup_count=3,
+                 flush_interval=1.0, flush_lines=256):
+        self.logger = logging.getLogger(name)
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.propagate = False
+        self.actions = logging.getLogger(f"{name}.actions")
+        self.errors = logging.getLogger(f"{name}.errors")
+        self.ui = logging.getLogger(f"{name}.ui")
+        self._handlers = []
+
+        writer_kwargs = dict(max_bytes=max_bytes, backup_count=backup_count,
+                             flush_interval=flush_interval, flush_lines=flush_lines)
+        text_format = logging.Formatter("[%(asctime)s] %(message)s", "%Y-%m-%d %H:%M:%S")
+        error_format = logging.Formatter("[%(asctime)s] %(levelname)s: %(message)s", "%Y-%m-%d %H:%M:%S")
+
+        self.add_handler(BufferedHandler(BufferedFileWriter(log_file, **writer_kwargs)), self.actions, text_format)
+        self.add_handler(BufferedHandler(BufferedFileWriter(error_log, **writer_kwargs)), self.errors, error_format)
+        if jsonl_file:
+            self.add_handler(BufferedHandler(BufferedFileWriter(jsonl_file, **writer_kwargs)),
+                             self.logger, JsonLinesFormatter())
+
+    def add_handler(self, handler, logger=None, formatter=None):
+        if formatter is not None:
+            handler.setFormatter(formatter)
+        (logger or self.logger).addHandler(handler)
+        self._handlers.append((logger or self.logger, handler))
+        return handler
+
+    def log(self, message, level="INFO", **data):
+        self.ui.log(LEVELS.get(level, logging.INFO), message, extra={'data': data} if data else None)
+
+    def action(self, action, **data):
+        self.actions.info(action, extra={'data': data} if data else None)
+
+    def error(self, message, **data):
+        # Трассировку прикладываем, только если сейчас обрабатывается исключение
+        self.errors.error(message, exc_info=sys.exc_info()[0] is not None,
+                          extra={'data': data} if data else None)
+
+    def flush(self):
+        for _, handler in self._handlers:
+            handler.flush()
+
+    def stats(self):
+        return [handler.writer.stats() for _, handler in self._handlers if isinstance(handler, BufferedHandler)]
+
+    def close(self):
+        for logger, handler in self._handlers:
+            logger.removeHandler(handler)
+            handler.close()
+        self._handlers = []
@@ -0,0 +1,455 @@
+# modules/log_viewer.py
+import os
+import re
+import threading
+import tkinter as tk
+from tkinter import ttk, scrolledtext
+
+import numpy as np
+
+LEVEL_NAMES = ("INFO", "SUCCESS", "WARNING", "ERROR")
+
+# "[INFO]" в строках лог-панели, "] ERROR:" в errors.log, "level": "..." в JSON Lines
+_LEVEL_RE = re.compile(r'\[(INFO|SUCCESS|WARNING|ERROR)\]|^\[[^\]]*\] (INFO|SUCCESS|WARNING|ERROR):'
+                       r'|"level": "(INFO|SUCCESS|WARNING|ERROR)"')
+
+_INDEX_CHUNK = 4 * 1024 ** 2
+
+
+def line_level(line, default="INFO"):
+    match = _LEVEL_RE.search(line)
+    if match is None:
+        return default
+    return match.group(1) or match.group(2) or match.group(3)
+
+
+def _is_continuation(line):
+    # Строки трассировки и прочие продолжения записи не начинаются с "[дата]" или "{"
+    return bool(line) and line[0] not in "[{"
+
+
+def append_capped(text_widget, entries, max_lines):
+    """
+    Дописывает (строка, тег) в tk.Text и удаляет самые старые строки сверх
+    max_lines — виджет лог-панели не растёт бесконечно.
+    """
+    entries = entries[-max_lines:]
+    text_widget.config(state=tk.NORMAL)
+    for line, tag in entries:
+        text_widget.insert(tk.END, line + "\n", tag)
+    excess = int(text_widget.index("end-1c").split(".")[0]) - 1 - max_lines
+    if excess > 0:
+        text_widget.delete("1.0", f"{excess + 1}.0")
+    text_widget.see(tk.END)
+    text_widget.config(state=tk.DISABLED)
+
+
+class _FileLines:
+    """Смещения начала строк одного файла (numpy int64, растёт с удвоением)"""
+
+    def __init__(self, path, inode):
+        self.path = path
+        self.inode = inode
+        self.offsets = np.zeros(1024, dtype=np.int64)
+        self.count = 0
+        self.end = 0
+
+    def extend(self, size):
+        if size <= self.end:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self.end)
+            position = self.end
+            while True:
+                chunk = f.read(_INDEX_CHUNK)
+                if not chunk:
+                    break
+                newlines = np.flatnonzero(np.frombuffer(chunk, dtype=np.uint8) == 10)
+                if len(newlines):
+                    # Начало строки — позиция после её предыдущего перевода строки
+                    starts = np.empty(len(newlines), dtype=np.int64)
+                    starts[0] = self.end
+                    starts[1:] = position + newlines[:-1] + 1
+                    self._append(starts)
+                    self.end = position + int(newlines[-1]) + 1
+                position += len(chunk)
+
+    def read(self, start, stop):
+        begin = int(self.offsets[start])
+        end = int(self.offsets[stop]) if stop < self.count else self.end
+        with open(self.path, "rb") as f:
+            f.seek(begin)
+            data = f.read(end - begin)
+        return data.decode("utf-8", errors="replace").splitlines()
+
+    def _append(self, starts):
+        needed = self.count + len(starts)
+        if needed > len(self.offsets):
+            capacity = len(self.offsets)
+            while capacity < needed:
+                capacity *= 2
+            grown = np.zeros(capacity, dtype=np.int64)
+            grown[:self.count] = self.offsets[:self.count]
+            self.offsets = grown
+        self.offsets[self.count:needed] = starts
+        self.count = needed
+
+
+class LogFileIndex:
+    """
+    Индекс смещений начала строк лога вместе с ротированными файлами
+    (path.backup_count … path.1, path — от старых к новым), как одна
+    сквозная нумерация строк. Файлы узнаются по inode, поэтому после
+    ротации уже построенные индексы переиспользуются; текущий файл только
+    дочитывается (refresh). Строки читаются seek'ом по смещениям, фильтр
+    по уровню и поиск возвращают номера строк. generation меняется, когда
+    меняется набор файлов — прежние номера строк после этого недействительны.
+    """
+
+    def __init__(self, path, backup_count=0):
+        self.path = path
+        self.backup_count = backup_count
+        self.generation = 0
+        self._segments = []
+        self._starts = np.zeros(1, dtype=np.int64)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return int(self._starts[-1])
+
+    def paths(self):
+        return [f"{self.path}.{i}" for i in range(self.backup_count, 0, -1)] + [self.path]
+
+    def refresh(self):
+        """Дочитывает новые строки; возвращает число добавленных (после смены набора файлов — все)"""
+        with self._lock:
+            before = len(self)
+            known = {segment.inode: segment for segment in self._segments}
+            segments = []
+            for path in self.paths():
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                segment = known.get(stat.st_ino)
+                if segment is None or stat.st_size < segment.end:
+                    segment = _FileLines(path, stat.st_ino)
+                # После ротации тот же файл лежит под другим именем
+                segment.path = path
+                segment.extend(stat.st_size)
+                segments.append(segment)
+
+            changed = [s.inode for s in segments] != [s.inode for s in self._segments]
+            self._segments = segments
+            self._starts = np.zeros(len(segments) + 1, dtype=np.int64)
+            np.cumsum([s.count for s in segments], out=self._starts[1:])
+            if changed:
+                self.generation += 1
+                return len(self)
+            return len(self) - before
+
+    def read_lines(self, start, stop):
+        """Строки [start, stop) по сквозной нумерации; на стыке файлов — по чтению на файл"""
+        with self._lock:
+            start = max(0, start)
+            stop = min(len(self), stop)
+            lines = []
+            if start >= stop:
+                return lines
+            first = int(np.searchsorted(self._starts, start, side="right")) - 1
+            for number in range(first, len(self._segments)):
+                base = int(self._starts[number])
+                if base >= stop:
+                    break
+                segment = self._segments[number]
+                lines.extend(segment.read(max(start, base) - base, min(stop, base + segment.count) - base))
+            return lines
+
+    def tail(self, count):
+        """Последние count строк с учётом ротированных файлов (сразу после ротации текущий почти пуст)"""
+        self.refresh()
+        total = len(self)
+        return self.read_lines(total - count, total)
+
+    def read_numbered(self, numbers):
+        """Строки по произвольным номерам (результат фильтра): соседние читаются одним блоком"""
+        result = []
+        numbers = list(numbers)
+        i = 0
+        while i < len(numbers):
+            j = i + 1
+            while j < len(numbers) and numbers[j] == numbers[j - 1] + 1:
+                j += 1
+            result.extend(self.read_lines(numbers[i], numbers[j - 1] + 1))
+            i = j
+        return result
+
+    def find(self, levels=None, text=None, block_lines=8192):
+        """
+        Номера строк, подходящих под уровни и подстроку (без учёта регистра).
+        Продолжения записи (трассировки) наследуют уровень своей записи.
+        Можно вызывать из фонового потока; результат сверяется с generation.
+        """
+        levels = set(levels) if levels else None
+        needle = text.lower() if text else None
+        matches = []
+        current = "INFO"
+        total = len(self)
+        for start in range(0, total, block_lines):
+            for number, line in enumerate(self.read_lines(start, min(total, start + block_lines)), start):
+                if not _is_continuation(line):
+                    current = line_level(line)
+                if levels is not None and current not in levels:
+                    continue
+                if needle is not None and needle not in line.lower():
+                    continue
+                matches.append(number)
+        return np.asarray(matches, dtype=np.int64)
+
+
+class LogViewer(tk.Frame):
+    """
+    Просмотр большого лог-файла: в виджете только окно из нескольких страниц
+    строк, более старые подгружаются с диска при прокрутке к началу, новые —
+    при прокрутке к концу (и по таймеру, если окно у конца файла).
+    Фильтр по уровню, поиск и дочитывание файла по таймеру (before_refresh +
+    refresh индекса) идут в фоновых потоках; результат возвращается в поток Tk
+    через dispatch (UIEventBus.dispatch). index — общий LogFileIndex, если он
+    уже есть у приложения.
+    """
+
+    def __init__(self, parent, path, colors, dispatch, backup_count=0, page_lines=500, max_pages=4,
+                 follow_ms=1000, font=("Consolas", 10), before_refresh=None, index=None):
+        super().__init__(parent, bg=colors['bg'])
+        self.index = index if index is not None else LogFileIndex(path, backup_count=backup_count)
+        self.colors = colors
+        self.dispatch = dispatch
+        self.page_lines = page_lines
+        self.max_lines = page_lines * max_pages
+        self.follow_ms = follow_ms
+        self.before_refresh = before_refresh
+        self._matches = None
+        self._filter = None
+        self._search_id = 0
+        self._first = 0
+        self._last = 0
+        self._loading = False
+
+        toolbar = tk.Frame(self, bg=colors['bg'])
+        toolbar.pack(fill=tk.X, padx=10, pady=(5, 0))
+        self.level_var = tk.StringVar(value="ALL")
+        ttk.Combobox(toolbar, textvariable=self.level_var, state="readonly", width=10,
+                     values=("ALL",) + LEVEL_NAMES).pack(side=tk.LEFT)
+        self.search_var = tk.StringVar()
+        search_entry = ttk.Entry(toolbar, textvariable=self.search_var, width=30)
+        search_entry.pack(side=tk.LEFT, padx=5)
+        search_entry.bind("<Return>", lambda e: self.apply_filter())
+        ttk.Button(toolbar, text="🔍", width=3, command=self.apply_filter).pack(side=tk.LEFT)
+        ttk.Button(toolbar, text="✖", width=3, command=self.reset_filter).pack(side=tk.LEFT, padx=(5, 0))
+        self.status_label = tk.Label(toolbar, text="", font=("Segoe UI", 9),
+                                     bg=colors['bg'], fg=colors.get('status_fg', colors['fg']))
+        self.status_label.pack(side=tk.RIGHT)
+
+        self.text = scrolledtext.ScrolledText(self, wrap=tk.WORD, font=font,
+                                              bg=colors['entry_bg'], fg=colors['fg'],
+                                              insertbackground=colors['fg'], relief=tk.FLAT,
+                                              padx=10, pady=10)
+        self.text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        for level, color in (("INFO", 'fg'), ("SUCCESS", 'success'), ("WARNING", 'warning'), ("ERROR", 'error')):
+            self.text.tag_config(level, foreground=colors.get(color, colors['fg']))
+        self._scrollbar_set = self.text.vbar.set
+        self.text.configure(yscrollcommand=self._on_scroll)
+        self.text.config(state=tk.DISABLED)
+
+        self._refresh_index()
+        self.show_tail()
+        if self.follow_ms:
+            self.after(self.follow_ms, self._follow)
+
+    @property
+    def total(self):
+        return len(self._matches) if self._matches is not None else len(self.index)
+
+    def show_tail(self):
+        self._first = max(0, self.total - self.page_lines)
+        self._last = self.total
+        self._render()
+        self.text.see(tk.END)
+
+    def apply_filter(self):
+        level = self.level_var.get()
+        text = self.search_var.get().strip()
+        if level == "ALL" and not text:
+            self.reset_filter()
+            return
+        self._filter = (None if level == "ALL" else [level], text or None)
+        self._start_search()
+
+    def reset_filter(self):
+        self.level_var.set("ALL")
+        self.search_var.set("")
+        self._search_id += 1
+        self._filter = None
+        self._matches = None
+        self.show_tail()
+
+    def _start_search(self):
+        # Поиск по всему логу может идти секунды — окно при этом не замирает
+        self._search_id += 1
+        levels, text = self._filter
+        self.status_label.config(text="🔍 Поиск...")
+        threading.Thread(target=self._search, args=(self._search_id, levels, text), daemon=True).start()
+
+    def _search(self, search_id, levels, text):
+        generation = None
+        try:
+            self._refresh_index()
+            generation = self.index.generation
+            matches, error = self.index.find(levels=levels, text=text), None
+        except Exception as e:
+            matches, error = None, e
+        self.dispatch(self._on_search_done, search_id, generation, matches, error)
+
+    def _on_search_done(self, search_id, generation, matches, error):
+        if search_id != self._search_id or not self.winfo_exists():
+            # Устаревший поиск или окно уже закрыто
+            return
+        if error is not None:
+            self.status_label.config(text=f"❌ Ошибка поиска: {error}")
+            return
+        if generation != self.index.generation:
+            # Пока шёл поиск, лог ротировался — номера строк устарели
+            self._start_search()
+            return
+        self._matches = matches
+        self.show_tail()
+
+    def _refresh_index(self):
+        if self.before_refresh is not None:
+            self.before_refresh()
+        return self.index.refresh()
+
+    def _read(self, first, last):
+        if self._matches is None:
+            return self.index.read_lines(first, last)
+        return self.index.read_numbered(self._matches[first:last].tolist())
+
+    def _tagged(self, lines):
+        entries = []
+        current = "INFO"
+        for line in lines:
+            if not _is_continuation(line):
+                current = line_level(line)
+            entries.append((line + "\n", current))
+        return entries
+
+    def _insert(self, position, lines):
+        entries = self._tagged(lines)
+        if position != tk.END:
+            # Вставка в начало: с конца, чтобы сохранить порядок
+            entries.reverse()
+        for line, tag in entries:
+            self.text.insert(position, line, tag)
+
+    def _render(self):
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        if self.total:
+            self._insert(tk.END, self._read(self._first, self._last))
+        else:
+            self.text.insert(tk.END, "Нет записей.")
+        self.text.config(state=tk.DISABLED)
+        self._update_status()
+
+    def _update_status(self):
+        shown = f"{self._first + 1}–{self._last}" if self._last > self._first else "0"
+        suffix = " (фильтр)" if self._matches is not None else ""
+        self.status_label.config(text=f"строки {shown} из {self.total}{suffix}")
+
+    def _on_scroll(self, first, last):
+        self._scrollbar_set(first, last)
+        if self._loading:
+            return
+        if float(first) <= 0.0 and self._first > 0:
+            self._loading = True
+            self.after_idle(self._load_older)
+        elif float(last) >= 1.0 and self._last < self.total:
+            self._loading = True
+            self.after_idle(self._load_newer)
+
+    def _load_older(self):
+        try:
+            first = max(0, self._first - self.page_lines)
+            lines = self._read(first, self._first)
+            self.text.config(state=tk.NORMAL)
+            self._insert("1.0", lines)
+            self._first = first
+            excess = (self._last - self._first) - self.max_lines
+            if excess > 0:
+                # Окно не растёт: лишние строки снизу выгружаются
+                self.text.delete(f"end-1c - {excess} lines", "end-1c")
+                self._last -= excess
+            self.text.config(state=tk.DISABLED)
+            self.text.see(f"{len(lines) + 1}.0")
+            self._update_status()
+        finally:
+            self._loading = False
+
+    def _load_newer(self):
+        try:
+            last = min(self.total, self._last + self.page_lines)
+            self._append_lines(self._read(self._last, last), last)
+        finally:
+            self._loading = False
+
+    def _append_lines(self, lines, last):
+        self.text.config(state=tk.NORMAL)
+        self._insert(tk.END, lines)
+        self._last = last
+        excess = (self._last - self._first) - self.max_lines
+        if excess > 0:
+            self.text.delete("1.0", f"{excess + 1}.0")
+            self._first += excess
+        self.text.config(state=tk.DISABLED)
+        self._update_status()
+
+    def _follow(self):
+        # Сброс буфера лога и дочитывание файлов — в фоне; следующий тик — после ответа
+        if not self.winfo_exists():
+            return
+        tail = self._last if self._filter is None and 0 < self._last >= self.total else None
+        threading.Thread(target=self._follow_worker, args=(self.index.generation, tail), daemon=True).start()
+
+    def _follow_worker(self, generation, tail):
+        lines = None
+        try:
+            added = self._refresh_index()
+            if tail is not None and added and self.index.generation == generation:
+                # Вид у конца файла: новые строки читаются здесь же, а не в потоке Tk
+                last = len(self.index)
+                lines = (tail, last, self.index.read_lines(tail, last))
+            error = None
+        except Exception as e:
+            added, error = 0, e
+        self.dispatch(self._on_follow_done, generation, added, lines, error)
+
+    def _on_follow_done(self, generation, added, lines, error):
+        if not self.winfo_exists():
+            return
+        if error is not None:
+            self.status_label.config(text=f"❌ Ошибка чтения лога: {error}")
+        elif not self._loading:
+            if self.index.generation != generation:
+                # Лог ротирован: номера строк сместились — перестраиваем вид (или повторяем поиск)
+                if self._filter is not None:
+                    self._start_search()
+                else:
+                    self.show_tail()
+            elif self._filter is None and added:
+                # С фильтром новые строки не показываются до следующего поиска
+                if lines is not None and lines[0] == self._last:
+                    self._append_lines(lines[2], lines[1])
+                    self.text.see(tk.END)
+                elif self._last == 0:
+                    self.show_tail()
+        self.after(self.follow_ms, self._follow)
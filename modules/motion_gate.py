@@ -0,0 +1,68 @@
+# modules/motion_gate.py
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """
+    Дешёвая предварительная стадия перед MediaPipe: на уменьшенной серой копии
+    кадра сравнивает его с фоновой моделью (скользящее среднее). Инференс нужен,
+    только если доля изменившихся пикселей выше порога или человек уже в кадре.
+    Раз в force_every кадров инференс выполняется принудительно — чтобы
+    заметить человека, который вошёл и замер между проверками.
+    """
+
+    def __init__(self, threshold=0.01, pixel_delta=25, width=160, learning_rate=0.05,
+                 force_every=30):
+        self.threshold = threshold
+        self.pixel_delta = pixel_delta
+        self.width = width
+        self.learning_rate = learning_rate
+        self.force_every = force_every
+        self.reset()
+
+    def reset(self):
+        self._background = None
+        self._gray = None
+        self._since_inference = 0
+        self.motion_ratio = 0.0
+        self.frames_inferred = 0
+        self.frames_skipped = 0
+
+    def measure(self, image):
+        """Возвращает долю изменившихся пикселей и обновляет фоновую модель"""
+        height, width = image.shape[:2]
+        size = (self.width, max(1, int(height * self.width / width)))
+        small = cv2.resize(image, size, interpolation=cv2.INTER_NEAREST)
+        self._gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        cv2.GaussianBlur(self._gray, (5, 5), 0, dst=self._gray)
+
+        if self._background is None or self._background.shape != self._gray.shape:
+            self._background = self._gray.astype(np.float32)
+            self.motion_ratio = 1.0
+            return self.motion_ratio
+
+        diff = cv2.absdiff(self._gray, cv2.convertScaleAbs(self._background))
+        changed = cv2.countNonZero(cv2.threshold(diff, self.pixel_delta, 255, cv2.THRESH_BINARY)[1])
+        cv2.accumulateWeighted(self._gray, self._background, self.learning_rate)
+        self.motion_ratio = changed / diff.size
+        return self.motion_ratio
+
+    def should_infer(self, image, person_tracked=False):
+        motion = self.measure(image) >= self.threshold
+        self._since_inference += 1
+        if person_tracked or motion or self._since_inference >= self.force_every:
+            self._since_inference = 0
+            self.frames_inferred += 1
+            return True
+        self.frames_skipped += 1
+        return False
+
+    def stats(self):
+        total = self.frames_inferred + self.frames_skipped
+        return {
+            'inferred': self.frames_inferred,
+            'skipped': self.frames_skipped,
+            'skipped_ratio': round(self.frames_skipped / total, 3) if total else 0.0,
+            'motion_ratio': round(self.motion_ratio, 4)
+        }
@@ -0,0 +1,306 @@
+# modules/parallel_video.py
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import cv2
+import numpy as np
+
+from modules.landmark_recorder import LANDMARK_DTYPE, landmarks_to_array
+from modules.landmark_replay import replay_presence
+from modules.pose_engine import DEFAULT_POSE_SETTINGS, create_pose, landmarks_confidence
+from modules.video_pipeline import VideoPipeline
+
+# Чанки короче этого не имеет смысла отдавать отдельному процессу
+MIN_CHUNK_FRAMES = 300
+
+# Как часто проверять остановку, пока ждём процессы и ffmpeg (сек)
+_STOP_POLL_SEC = 0.2
+
+# Событие остановки в процессе-обработчике (передаётся через initializer пула)
+_stop_event = None
+
+
+def _init_worker(stop_event):
+    global _stop_event
+    _stop_event = stop_event
+
+
+def _stop_requested():
+    return _stop_event is not None and _stop_event.is_set()
+
+
+def _watch_stop(pipeline, done):
+    """Поток внутри процесса чанка: переносит остановку пула в VideoPipeline.stop()"""
+    while not done.wait(_STOP_POLL_SEC):
+        if _stop_requested():
+            pipeline.stop()
+            return
+
+
+def split_into_chunks(total_frames, workers, min_chunk_frames=MIN_CHUNK_FRAMES):
+    """Делит диапазон кадров [0, total_frames) на непрерывные чанки (start, end)"""
+    if total_frames <= 0:
+        return []
+    count = max(1, min(workers, total_frames // max(1, min_chunk_frames)))
+    size, extra = divmod(total_frames, count)
+    chunks = []
+    start = 0
+    for i in range(count):
+        end = start + size + (1 if i < extra else 0)
+        chunks.append((start, end))
+        start = end
+    return chunks
+
+
+def _process_chunk(task):
+    """
+    Выполняется в отдельном процессе: обрабатывает кадры [start, end) своим графом Pose.
+    Перемотка через CAP_PROP_POS_FRAMES на многих кодеках неточна (переход к ключевому
+    кадру), поэтому кадры до начала прогрева декодируются grab() без преобразования —
+    границы чанков не дублируют и не теряют кадры.
+    """
+    index, video_path, chunk_path, start, end, overlap, pose_kwargs, keep_landmarks = task
+    started = time.perf_counter()
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"Не удалось открыть видеофайл: {video_path}")
+
+    fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    out = cv2.VideoWriter(chunk_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+    if not out.isOpened():
+        cap.release()
+        raise IOError(f"Не удалось создать файл чанка: {chunk_path}")
+
+    warm_start = max(0, start - overlap)
+    presence = bytearray(end - start)
+    # Уверенность кадров — как в однопроцессном пути, для min_confidence и взвешенного входа
+    confidence = np.zeros(end - start, dtype=np.float32)
+    # Landmarks нужны только для записи и кэша — иначе не тратим память
+    records = np.zeros(end - start if keep_landmarks else 0, dtype=LANDMARK_DTYPE)
+
+    def on_result(frame_num, landmarks):
+        presence[frame_num] = 1 if landmarks else 0
+        confidence[frame_num] = landmarks_confidence(landmarks)
+        if keep_landmarks:
+            row = records[frame_num]
+            row['frame'] = start + frame_num
+            row['timestamp'] = (start + frame_num) / fps
+            row['present'] = bool(landmarks)
+            landmarks_to_array(landmarks, out=row['landmarks'])
+
+    summary = {'frames': 0}
+    done = threading.Event()
+    try:
+        for _ in range(warm_start):
+            if _stop_requested() or not cap.grab():
+                break
+        with create_pose(**pose_kwargs) as pose:
+            # 🔥 Прогрев трекинга на кадрах перекрытия (в выходной файл не пишутся)
+            for _ in range(start - warm_start):
+                if _stop_requested():
+                    break
+                success, image = cap.read()
+                if not success:
+                    break
+                pose.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+
+            if not _stop_requested():
+                pipeline = VideoPipeline(cap, out, pose, total_frames=end - start,
+                                         result_callback=on_result)
+                threading.Thread(target=_watch_stop, args=(pipeline, done), daemon=True).start()
+                summary = pipeline.run()
+    finally:
+        done.set()
+        cap.release()
+        out.release()
+
+    frames = summary['frames']
+    return {
+        'index': index,
+        'path': chunk_path,
+        'start': start,
+        'frames': frames,
+        'presence': bytes(presence[:frames]),
+        'confidence': confidence[:frames],
+        'landmarks': records[:frames],
+        'elapsed_sec': time.perf_counter() - started
+    }
+
+
+class ParallelVideoProcessor:
+    """
+    Обработка длинного видео пулом процессов: файл делится на диапазоны кадров,
+    каждый диапазон обрабатывается своим процессом со своим графом Pose,
+    затем чанки склеиваются по порядку, а интервалы обнаружения
+    восстанавливаются по флагам присутствия с таймлайна видео.
+    landmark_callback(records) получает landmarks чанков (LANDMARK_DTYPE)
+    по порядку кадров — для записи и кэша; stop() из другого потока
+    отменяет ожидающие чанки и останавливает процессы и склейку.
+    """
+
+    def __init__(self, video_path, save_path, workers=None, overlap=15, pose_kwargs=None,
+                 progress_callback=None, landmark_callback=None):
+        self.video_path = video_path
+        self.save_path = save_path
+        self.workers = workers or os.cpu_count() or 1
+        self.overlap = overlap
+        self.pose_kwargs = pose_kwargs or dict(DEFAULT_POSE_SETTINGS)
+        self.progress_callback = progress_callback
+        self.landmark_callback = landmark_callback
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    @property
+    def stopped(self):
+        return self._stop_event.is_set()
+
+    def run(self, human_detector=None, context="видео"):
+        """Сводка обработки; None, если обработку остановили через stop()"""
+        started = time.perf_counter()
+        cap = cv2.VideoCapture(self.video_path)
+        if not cap.isOpened():
+            raise IOError(f"Не удалось открыть видеофайл: {self.video_path}")
+        fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
+
+        chunks = split_into_chunks(total_frames, self.workers)
+        if not chunks:
+            raise ValueError(f"Не удалось определить число кадров: {self.video_path}")
+
+        save_dir = os.path.dirname(os.path.abspath(self.save_path))
+        tmp_dir = tempfile.mkdtemp(prefix=".chunks_", dir=save_dir)
+        try:
+            tasks = [
+                (i, self.video_path, os.path.join(tmp_dir, f"chunk_{i:04d}.mp4"),
+                 start, end, self.overlap, self.pose_kwargs, self.landmark_callback is not None)
+                for i, (start, end) in enumerate(chunks)
+            ]
+            results = self._run_chunks(tasks, total_frames)
+            if results is None:
+                return None
+
+            processed_at = time.perf_counter()
+            self._concat_chunks([r['path'] for r in results], fps, (width, height))
+            if self.stopped:
+                return None
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        if self.landmark_callback is not None:
+            for result in results:
+                self.landmark_callback(result['landmarks'])
+
+        presence = b"".join(r['presence'] for r in results)
+        if human_detector is not None:
+            confidence = np.concatenate([r['confidence'] for r in results])
+            self._replay_presence(human_detector, presence, fps, context, confidence)
+
+        elapsed = time.perf_counter() - started
+        return {
+            'frames': len(presence),
+            'chunks': len(results),
+            'workers': min(self.workers, len(results)),
+            'elapsed_sec': round(elapsed, 3),
+            'stitch_sec': round(time.perf_counter() - processed_at, 3),
+            'fps': round(len(presence) / elapsed, 1) if elapsed > 0 else 0.0
+        }
+
+    def _run_chunks(self, tasks, total_frames):
+        """Результаты чанков по порядку; None при остановке"""
+        context = multiprocessing.get_context()
+        worker_stop = context.Event()
+        pool = ProcessPoolExecutor(max_workers=min(self.workers, len(tasks)), mp_context=context,
+                                   initializer=_init_worker, initargs=(worker_stop,))
+        results = [None] * len(tasks)
+        done_frames = 0
+        finished = False
+        try:
+            pending = {pool.submit(_process_chunk, task) for task in tasks}
+            while pending and not self.stopped:
+                done, pending = wait(pending, timeout=_STOP_POLL_SEC, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    results[result['index']] = result
+                    done_frames += result['frames']
+                    self._report_progress(done_frames, total_frames)
+            finished = not pending
+        finally:
+            if not finished:
+                # Остановка или ошибка: ожидающие чанки отменяем, запущенные процессы
+                # завершают текущий кадр и выходят, не дожидаясь конца своего диапазона
+                worker_stop.set()
+            pool.shutdown(wait=True, cancel_futures=True)
+        return results if finished and not self.stopped else None
+
+    def _concat_chunks(self, paths, fps, size):
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg and self._concat_with_ffmpeg(ffmpeg, paths):
+            return
+        self._concat_with_opencv(paths, fps, size)
+
+    def _concat_with_ffmpeg(self, ffmpeg, paths):
+        """Склейка без перекодирования (concat demuxer)"""
+        list_path = os.path.join(os.path.dirname(paths[0]), "chunks.txt")
+        with open(list_path, "w", encoding="utf-8") as f:
+            for path in paths:
+                f.write(f"file '{os.path.abspath(path)}'\n")
+        cmd = [ffmpeg, "-y", "-loglevel", "error", "-f", "concat", "-safe", "0",
+               "-i", list_path, "-c", "copy", self.save_path]
+        process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        while True:
+            try:
+                return process.wait(_STOP_POLL_SEC) == 0
+            except subprocess.TimeoutExpired:
+                if self.stopped:
+                    process.kill()
+                    process.wait()
+                    # Остановлено — повторять склейку через OpenCV не нужно
+                    return True
+
+    def _concat_with_opencv(self, paths, fps, size):
+        out = cv2.VideoWriter(self.save_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, size)
+        if not out.isOpened():
+            raise IOError(f"Не удалось создать выходной файл: {self.save_path}")
+        try:
+            for path in paths:
+                cap = cv2.VideoCapture(path)
+                while not self.stopped:
+                    success, image = cap.read()
+                    if not success:
+                        break
+                    out.write(image)
+                cap.release()
+        finally:
+            out.release()
+
+    @staticmethod
+    def _replay_presence(human_detector, presence, fps, context, confidence=None):
+        """Прогоняет флаги присутствия и уверенность кадров через детектор со временем по таймлайну видео"""
+        base_time = time.time()
+        timestamps = base_time + np.arange(len(presence)) / fps
+        replay_presence(human_detector, np.frombuffer(presence, dtype=np.uint8), timestamps,
+                        context=context, end_time=base_time + len(presence) / fps, confidence=confidence)
+
+    def _report_progress(self, done, total):
+        if self.progress_callback:
+            self.progress_callback(done, total)
+
+
+def format_parallel_summary(summary):
+    return (f"Параллельная обработка: {summary['frames']} кадров, {summary['chunks']} чанков "
+            f"на {summary['workers']} процессах за {summary['elapsed_sec']} с "
+            f"({summary['fps']} к/с, склейка {summary['stitch_sec']} с)")
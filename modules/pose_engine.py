@@ -0,0 +1,157 @@
+# modules/pose_engine.py
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+DEFAULT_POSE_SETTINGS = {
+    "model_complexity": 1,
+    "min_detection_confidence": 0.5,
+    "min_tracking_confidence": 0.5,
+    "smooth_landmarks": True
+}
+
+
+_solutions = None
+
+
+def mp_solutions():
+    """mediapipe импортируется при первом обращении, а не при запуске приложения"""
+    global _solutions
+    if _solutions is None:
+        import mediapipe as mp
+        _solutions = mp.solutions
+    return _solutions
+
+
+def create_pose(**pose_kwargs):
+    kwargs = dict(DEFAULT_POSE_SETTINGS)
+    kwargs.update(pose_kwargs)
+    return mp_solutions().pose.Pose(**kwargs)
+
+
+def draw_pose(image, landmarks):
+    solutions = mp_solutions()
+    solutions.drawing_utils.draw_landmarks(
+        image,
+        landmarks,
+        solutions.pose.POSE_CONNECTIONS,
+        landmark_drawing_spec=solutions.drawing_styles.get_default_pose_landmarks_style())
+
+
+def array_to_landmarks(array):
+    """Массив (33, 4) из записи/кэша → NormalizedLandmarkList для draw_pose"""
+    from mediapipe.framework.formats import landmark_pb2
+    return landmark_pb2.NormalizedLandmarkList(landmark=[
+        landmark_pb2.NormalizedLandmark(x=float(x), y=float(y), z=float(z), visibility=float(v))
+        for x, y, z, v in array
+    ])
+
+
+def landmarks_confidence(landmarks):
+    """Средняя visibility точек скелета (0, если landmarks нет)"""
+    if not landmarks:
+        return 0.0
+    points = landmarks.landmark
+    return sum(lm.visibility for lm in points) / len(points)
+
+
+def pose_kwargs_from_settings(settings):
+    """Параметры mp_pose.Pose из секции "pose" settings.json (недостающие — по умолчанию)"""
+    kwargs = dict(DEFAULT_POSE_SETTINGS)
+    for key, value in (settings.get("pose") or {}).items():
+        if key in kwargs:
+            kwargs[key] = value
+    return kwargs
+
+
+class PoseEngine:
+    """
+    Долгоживущий граф MediaPipe Pose. Создаётся лениво один раз, прогревается
+    на пустом кадре (warmup() вызывается из фонового загрузчика) и переиспользуется между сеансами камеры и обработки
+    видео — перед каждым сеансом сбрасывается только состояние трекинга.
+    Если граф уже занят другим сеансом, на время сеанса создаётся отдельный.
+    """
+
+    def __init__(self, **pose_kwargs):
+        self.pose_kwargs = dict(DEFAULT_POSE_SETTINGS)
+        self.pose_kwargs.update(pose_kwargs)
+        self._pose = None
+        self._create_lock = threading.Lock()
+        self._session_lock = threading.Lock()
+        self._warming = threading.Event()
+        self._dirty = False
+        self.is_warm = False
+
+    def _create(self):
+        return create_pose(**self.pose_kwargs)
+
+    def _get(self):
+        with self._create_lock:
+            if self._pose is None:
+                self._pose = self._create()
+            return self._pose
+
+    def warmup(self):
+        # Пока идёт прогрев, новые сеансы ждут общий граф, а не строят свой
+        self._warming.set()
+        with self._session_lock:
+            try:
+                pose = self._get()
+                # Первый кадр инициализирует модель и выделяет буферы графа
+                pose.process(np.zeros((256, 256, 3), dtype=np.uint8))
+                self._reset(pose)
+                self._dirty = False
+                self.is_warm = True
+            finally:
+                self._warming.clear()
+
+    def _reset(self, pose):
+        reset = getattr(pose, "reset", None)
+        if reset is not None:
+            reset()
+            return pose
+        # Старые версии MediaPipe не умеют сбрасывать граф — пересоздаём его
+        pose.close()
+        with self._create_lock:
+            self._pose = self._create()
+            return self._pose
+
+    @contextmanager
+    def session(self):
+        """Граф для одного сеанса с чистым состоянием трекинга"""
+        # Прогрев дожидаемся, а занятый другим сеансом граф не ждём
+        if not self._session_lock.acquire(blocking=self._warming.is_set()):
+            pose = self._create()
+            try:
+                yield pose
+            finally:
+                pose.close()
+            return
+
+        try:
+            pose = self._get()
+            if self._dirty:
+                pose = self._reset(pose)
+            self._dirty = True
+            yield pose
+        finally:
+            self._session_lock.release()
+
+    def close(self, timeout=5.0):
+        """
+        Закрывает общий граф, дождавшись конца текущего сеанса (не дольше timeout).
+        Если сеанс так и не завершился, граф не трогаем — возвращается False.
+        """
+        if not self._session_lock.acquire(timeout=timeout):
+            return False
+        try:
+            with self._create_lock:
+                if self._pose is not None:
+                    self._pose.close()
+                    self._pose = None
+            self._dirty = False
+            self.is_warm = False
+        finally:
+            self._session_lock.release()
+        return True
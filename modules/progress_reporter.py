@@ -0,0 +1,93 @@
+# modules/progress_reporter.py
+import sys
+import time
+
+
+class ProgressReporter:
+    """
+    Прогресс обработки с ограничением частоты: вызывать можно на каждом кадре,
+    а callback получает снимок не чаще раза в interval секунд (и всегда — в конце).
+    Снимок: кадры, %, скорость (к/с), ETA и скорость стадий, если задан stage_source.
+    Совместим с progress_callback(done, total) у VideoPipeline и ParallelVideoProcessor.
+    """
+
+    def __init__(self, callback, total=0, interval=0.25, stage_source=None, smoothing=0.3):
+        self.callback = callback
+        self.total = total
+        self.interval = interval
+        self.stage_source = stage_source
+        self.smoothing = smoothing
+        self.started = time.perf_counter()
+        self.fps = 0.0
+        self.snapshot = None
+        self._last_emit = None
+        self._last_done = 0
+
+    def __call__(self, done, total=None):
+        self.update(done, total)
+
+    def update(self, done, total=None):
+        if total:
+            self.total = total
+        now = time.perf_counter()
+        finished = bool(self.total) and done >= self.total
+        if self._last_emit is not None and now - self._last_emit < self.interval and not finished:
+            return
+        self._emit(done, now)
+
+    def finish(self, done):
+        """
+        Итоговый снимок по фактическому числу кадров (CAP_PROP_FRAME_COUNT — только
+        оценка, поэтому update() мог так и не дойти до 100%). Возвращает снимок.
+        """
+        if self.snapshot is None or self.snapshot['done'] != done or self.total != done:
+            self.total = done
+            self._emit(done, time.perf_counter())
+        return self.snapshot
+
+    def _emit(self, done, now):
+        since = now - (self._last_emit if self._last_emit is not None else self.started)
+        if since > 0 and done > self._last_done:
+            instant = (done - self._last_done) / since
+            self.fps = instant if self.fps == 0 else self.fps + self.smoothing * (instant - self.fps)
+        self._last_emit = now
+        self._last_done = done
+
+        elapsed = now - self.started
+        remaining = max(0, self.total - done) if self.total else None
+        self.snapshot = {
+            'done': done,
+            'total': self.total,
+            'percent': int(done / self.total * 100) if self.total else 0,
+            'fps': round(self.fps, 1),
+            'elapsed_sec': round(elapsed, 1),
+            'eta_sec': round(remaining / self.fps, 1) if remaining is not None and self.fps > 0 else None,
+            'stages': self.stage_source() if self.stage_source else None
+        }
+        self.callback(self.snapshot)
+
+
+def format_eta(seconds):
+    if seconds is None:
+        return "—"
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+
+
+def format_progress(snapshot):
+    text = (f"{snapshot['done']}/{snapshot['total'] or '?'} кадров | {snapshot['fps']} к/с | "
+            f"осталось {format_eta(snapshot['eta_sec'])}")
+    if snapshot['stages']:
+        text += " | " + ", ".join(f"{name} {fps} к/с" for name, fps in snapshot['stages'].items())
+    return text
+
+
+def console_callback(prefix="", stream=None):
+    """Вывод прогресса для headless-режима (по строке на снимок — безопасно для нескольких процессов)"""
+    stream = stream or sys.stderr
+
+    def report(snapshot):
+        stream.write(f"{prefix}{snapshot['percent']:3d}% | {format_progress(snapshot)}\n")
+        stream.flush()
+    return report
@@ -0,0 +1,125 @@
+# modules/screenshot_service.py
+import os
+import queue
+import threading
+from datetime import datetime
+
+import cv2
+
+_STOP = object()
+
+FORMATS = ("jpg", "png", "webp")
+
+
+class ScreenshotService:
+    """
+    Сохранение скриншотов в фоне: кадр копируется и ставится в ограниченную
+    очередь, кодирование (cv2.imencode отпускает GIL) и запись на диск делает
+    пул потоков. При переполнении очереди policy="drop" отбрасывает кадр,
+    policy="block" ждёт освобождения места не дольше block_timeout.
+    """
+
+    def __init__(self, directory, fmt="jpg", quality=90, workers=2, queue_size=8,
+                 policy="drop", block_timeout=1.0, log_callback=None):
+        if fmt not in FORMATS:
+            raise ValueError(f"Неподдерживаемый формат скриншота: {fmt}")
+        self.directory = directory
+        self.fmt = fmt
+        self.quality = quality
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.log_callback = log_callback
+        os.makedirs(self.directory, exist_ok=True)
+
+        self.saved = 0
+        self.failed = 0
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._last_stamp = None
+        self._same_stamp = 0
+        self._workers = [threading.Thread(target=self._work, daemon=True) for _ in range(max(1, workers))]
+        for worker in self._workers:
+            worker.start()
+
+    def save(self, frame, prefix, copy=True, on_done=None):
+        """Ставит кадр в очередь; возвращает будущий путь файла или None, если кадр отброшен"""
+        path = os.path.join(self.directory, f"{prefix}_{self._unique_stamp()}.{self.fmt}")
+        item = (frame.copy() if copy else frame, path, on_done)
+        try:
+            if self.policy == "block":
+                self._queue.put(item, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(item)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            if self.log_callback:
+                self.log_callback(f"⚠️ Очередь скриншотов переполнена, кадр пропущен: {path}", "WARNING")
+            return None
+        return path
+
+    def stats(self):
+        with self._lock:
+            return {
+                'queued': self._queue.qsize(),
+                'saved': self.saved,
+                'failed': self.failed,
+                'dropped': self.dropped
+            }
+
+    def close(self, wait=True):
+        for _ in self._workers:
+            self._queue.put(_STOP)
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    def _unique_stamp(self):
+        # Микросекунды + счётчик: два снимка в одну секунду (и даже микросекунду) не перезаписывают друг друга
+        now = datetime.now()
+        stamp = now.strftime("%Y%m%d_%H%M%S_") + f"{now.microsecond:06d}"
+        with self._lock:
+            if stamp == self._last_stamp:
+                self._same_stamp += 1
+                return f"{stamp}_{self._same_stamp}"
+            self._last_stamp = stamp
+            self._same_stamp = 0
+        return stamp
+
+    def _encode_params(self):
+        if self.fmt == "jpg":
+            return [cv2.IMWRITE_JPEG_QUALITY, int(self.quality)]
+        if self.fmt == "webp":
+            return [cv2.IMWRITE_WEBP_QUALITY, int(self.quality)]
+        # Для PNG качество 0..100 переводится в степень сжатия 9..0
+        return [cv2.IMWRITE_PNG_COMPRESSION, max(0, min(9, round((100 - self.quality) / 11)))]
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            frame, path, on_done = item
+            success = False
+            try:
+                encoded, buffer = cv2.imencode("." + self.fmt, frame, self._encode_params())
+                if encoded:
+                    with open(path, "wb") as f:
+                        f.write(buffer)
+                    success = True
+            except (cv2.error, OSError):
+                success = False
+
+            with self._lock:
+                if success:
+                    self.saved += 1
+                else:
+                    self.failed += 1
+            if on_done is not None:
+                on_done(path, success)
+            elif self.log_callback:
+                if success:
+                    self.log_callback(f"📸 Скриншот сохранён: {path}", "SUCCESS")
+                else:
+                    self.log_callback(f"❌ Не удалось сохранить скриншот: {path}", "ERROR")
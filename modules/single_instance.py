@@ -0,0 +1,55 @@
+# modules/single_instance.py
+import os
+import tempfile
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+DEFAULT_LOCK_PATH = os.path.join(tempfile.gettempdir(), "mediapipe_skeleton_tracker.lock")
+
+
+class SingleInstanceLock:
+    """
+    Защита от двойного запуска через эксклюзивную блокировку файла.
+    Блокировку держит открытый дескриптор, поэтому ОС снимает её сама,
+    даже если процесс завершился аварийно — «зависших» lock-файлов не бывает.
+    """
+
+    def __init__(self, path=DEFAULT_LOCK_PATH):
+        self.path = path
+        self._file = None
+
+    def acquire(self):
+        """True — блокировка получена, False — приложение уже запущено"""
+        handle = open(self.path, "a+")
+        try:
+            if os.name == "nt":
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+
+        handle.seek(0)
+        handle.truncate()
+        handle.write(str(os.getpid()))
+        handle.flush()
+        self._file = handle
+        return True
+
+    def release(self):
+        if self._file is None:
+            return
+        try:
+            if os.name == "nt":
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._file.close()
+            self._file = None
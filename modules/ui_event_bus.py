@@ -0,0 +1,137 @@
+# modules/ui_event_bus.py
+import collections
+import tkinter as tk
+import traceback
+
+
+class LogEvent:
+    __slots__ = ('message', 'level')
+
+    def __init__(self, message, level="INFO"):
+        self.message = message
+        self.level = level
+
+
+class ProgressEvent:
+    __slots__ = ('text', 'value')
+
+    def __init__(self, text, value):
+        self.text = text
+        self.value = value
+
+
+class CallEvent:
+    """Произвольный вызов в потоке Tk (messagebox, обновление кнопок и т.п.)"""
+
+    __slots__ = ('func', 'args', 'kwargs')
+
+    def __init__(self, func, *args, **kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+
+class UIEventBus:
+    """
+    Шина событий от рабочих потоков к Tk. post() только добавляет событие
+    в deque (append/popleft атомарны, блокировок нет), главный поток
+    забирает их пачками на одном таймере root.after. События обрабатываются
+    строго в порядке поступления: обработчик получает подряд идущие события
+    своего типа одним списком, для coalesce-типов (прогресс) — только последнее.
+    Ошибки обработчиков передаются в error_callback(message) (в блоке except —
+    трассировка доступна через sys.exc_info()) и не теряют остаток пачки.
+    """
+
+    def __init__(self, root, interval_ms=50, max_batch=1000, error_callback=None):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.max_batch = max_batch
+        self.error_callback = error_callback
+        self._events = collections.deque()
+        self._handlers = {}
+        self._coalesce = set()
+        self._running = False
+
+    def subscribe(self, event_type, handler, coalesce=False):
+        self._handlers[event_type] = handler
+        if coalesce:
+            self._coalesce.add(event_type)
+
+    def post(self, event):
+        self._events.append(event)
+
+    def call(self, func, *args, **kwargs):
+        self.post(CallEvent(func, *args, **kwargs))
+
+    def dispatch(self, func, *args):
+        """Совместимая с root.after(0, ...) форма — для BackgroundLoader и ExportQueue"""
+        self.call(func, *args)
+
+    def start(self):
+        self._running = True
+        self._tick()
+        return self
+
+    def stop(self):
+        self._running = False
+
+    def drain(self):
+        """Обрабатывает накопленные события; возвращает их число"""
+        batch = []
+        events = self._events
+        while events and len(batch) < self.max_batch:
+            batch.append(events.popleft())
+        if not batch:
+            return 0
+
+        # Подряд идущие события одного типа — одним вызовом обработчика, порядок между типами сохраняется
+        run = []
+        for event in batch:
+            if run and type(event) is not type(run[0]):
+                self._dispatch_run(run)
+                run = []
+            if isinstance(event, CallEvent):
+                self._call(event)
+            else:
+                run.append(event)
+        if run:
+            self._dispatch_run(run)
+        return len(batch)
+
+    def _call(self, event):
+        try:
+            event.func(*event.args, **event.kwargs)
+        except Exception:
+            # Ошибка одного вызова не должна терять остальные события пачки
+            self._report_error(getattr(event.func, "__name__", repr(event.func)))
+
+    def _dispatch_run(self, run):
+        event_type = type(run[0])
+        handler = self._handlers.get(event_type)
+        if handler is None:
+            return
+        try:
+            handler(run[-1:] if event_type in self._coalesce else run)
+        except Exception:
+            self._report_error(event_type.__name__)
+
+    def _report_error(self, source):
+        if self.error_callback is not None:
+            try:
+                self.error_callback(f"Ошибка обработчика UI ({source})")
+                return
+            except Exception:
+                pass
+        traceback.print_exc()
+
+    def _tick(self):
+        if not self._running:
+            return
+        try:
+            self.drain()
+        finally:
+            try:
+                # Если очередь не успели разобрать — следующий тик сразу
+                self.root.after(0 if self._events else self.interval_ms, self._tick)
+            except (RuntimeError, tk.TclError):
+                self._running = False
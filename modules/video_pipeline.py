@@ -0,0 +1,283 @@
+# modules/video_pipeline.py
+import queue
+import threading
+import time
+
+import cv2
+
+from modules.frame_pool import FramePool
+from modules.pose_engine import draw_pose, landmarks_confidence
+
+# Маркер конца потока кадров между стадиями
+_END = object()
+
+
+class StageStats:
+    def __init__(self, name):
+        self.name = name
+        self.frames = 0
+        self.busy_time = 0.0
+        self.wait_time = 0.0
+
+    @property
+    def fps(self):
+        """Пропускная способность стадии без учёта ожидания очередей"""
+        return self.frames / self.busy_time if self.busy_time > 0 else 0.0
+
+    def as_dict(self):
+        return {
+            'frames': self.frames,
+            'busy_sec': round(self.busy_time, 3),
+            'wait_sec': round(self.wait_time, 3),
+            'fps': round(self.fps, 1)
+        }
+
+
+class VideoPipeline:
+    """
+    Многопоточная обработка видеофайла: декодер → инференс → отрисовка/запись.
+    Стадии связаны ограниченными очередями, поэтому быстрый декодер не уходит
+    вперёд больше чем на queue_size кадров, а порядок кадров сохраняется.
+    Инференс выполняется в вызывающем потоке. Если задан landmark_source
+    (кадр → landmarks, например запись из кэша), модель не вызывается вовсе.
+    """
+
+    def __init__(self, cap, out, pose, human_detector=None, context="видео",
+                 total_frames=0, queue_size=16, progress_callback=None, result_callback=None,
+                 rate_controller=None, landmark_source=None, fps=None):
+        self.cap = cap
+        self.out = out
+        self.pose = pose
+        self.human_detector = human_detector
+        self.context = context
+        self.total_frames = total_frames
+        self.progress_callback = progress_callback
+        self.result_callback = result_callback
+        self.rate_controller = rate_controller
+        self.landmark_source = landmark_source
+        # Время кадров для детектора — по таймлайну видео, а не по скорости обработки
+        self.fps = fps if fps and fps > 0 else None
+        self.base_time = None
+
+        self.decode_queue = queue.Queue(maxsize=queue_size)
+        self.write_queue = queue.Queue(maxsize=queue_size)
+        self.stats = {name: StageStats(name) for name in ("decode", "inference", "write")}
+        self.elapsed = 0.0
+
+        # Буферов нужно не больше, чем кадров «в полёте» между стадиями
+        self.frame_pool = FramePool(max_free=2 * queue_size + 4)
+        self._rgb = None
+
+        self._stop_event = threading.Event()
+        self._error = None
+
+    def stop(self):
+        self._stop_event.set()
+
+    @property
+    def stopped(self):
+        """Остановлен извне через stop(), а не завершён или прерван ошибкой"""
+        return self._stop_event.is_set() and self._error is None
+
+    def run(self):
+        started = time.perf_counter()
+        self.base_time = time.time()
+        decoder = threading.Thread(target=self._guarded, args=(self._decode_loop,), daemon=True)
+        writer = threading.Thread(target=self._guarded, args=(self._write_loop,), daemon=True)
+        decoder.start()
+        writer.start()
+
+        try:
+            self._inference_loop()
+        except Exception as e:
+            self._fail(e)
+
+        decoder.join()
+        writer.join()
+        self.elapsed = time.perf_counter() - started
+
+        if self._error is not None:
+            raise self._error
+
+        self._report_progress()
+        return self.summary()
+
+    def stage_fps(self):
+        """Текущая скорость стадий — для отчёта о прогрессе во время работы"""
+        return {name: round(s.fps, 1) for name, s in self.stats.items()}
+
+    def summary(self):
+        stages = {name: s.as_dict() for name, s in self.stats.items()}
+        bottleneck = max(self.stats.values(), key=lambda s: s.busy_time).name
+        frames = self.stats["write"].frames
+        return {
+            'frames': frames,
+            'elapsed_sec': round(self.elapsed, 3),
+            'fps': round(frames / self.elapsed, 1) if self.elapsed > 0 else 0.0,
+            'stages': stages,
+            'bottleneck': bottleneck
+        }
+
+    # --- Стадии ---
+
+    def _decode_loop(self):
+        stats = self.stats["decode"]
+        frame_num = 0
+        try:
+            while not self._stop_event.is_set():
+                if self.total_frames and frame_num >= self.total_frames:
+                    break
+                t0 = time.perf_counter()
+                frame = self._read_frame()
+                stats.busy_time += time.perf_counter() - t0
+                if frame is None:
+                    break
+                stats.frames += 1
+                if not self._put(self.decode_queue, (frame_num, frame), stats):
+                    return
+                frame_num += 1
+        finally:
+            self._put(self.decode_queue, _END, stats)
+
+    def _inference_loop(self):
+        stats = self.stats["inference"]
+        controller = self.rate_controller
+        landmarks = None
+        try:
+            while True:
+                item = self._get(self.decode_queue, stats)
+                if item is _END or item is None:
+                    break
+                frame_num, frame = item
+                image = frame.view()
+
+                t0 = time.perf_counter()
+                # На пропущенных контроллером кадрах переиспользуются прошлые landmarks
+                if self.landmark_source is not None:
+                    landmarks = self.landmark_source(frame_num)
+                elif controller is None or controller.should_infer():
+                    landmarks = self._infer(image)
+                    if controller is not None:
+                        controller.record(time.perf_counter() - t0)
+
+                if self.result_callback:
+                    self.result_callback(frame_num, landmarks)
+                if self.human_detector is not None:
+                    self.human_detector.update(
+                        has_pose_landmarks=bool(landmarks),
+                        context=self.context,
+                        frame_num=frame_num,
+                        current_frame=image,
+                        timestamp=self._timestamp(frame_num),
+                        confidence=landmarks_confidence(landmarks)
+                    )
+                stats.busy_time += time.perf_counter() - t0
+                stats.frames += 1
+
+                if not self._put(self.write_queue, (frame_num, frame, landmarks), stats):
+                    return
+                self._report_progress()
+            if self.human_detector is not None and self.fps:
+                # Человек в кадре до конца видео — закрываем интервал по времени последнего кадра
+                self.human_detector.close(context=self.context, timestamp=self._timestamp(stats.frames))
+        finally:
+            self._put(self.write_queue, _END, stats)
+
+    def _timestamp(self, frame_num):
+        if self.fps is None:
+            return None
+        return self.base_time + frame_num / self.fps
+
+    def _read_frame(self):
+        if self.frame_pool.shape is None:
+            success, image = self.cap.read()
+            return self.frame_pool.adopt(image) if success else None
+        frame = self.frame_pool.acquire(self.frame_pool.shape)
+        success, image = self.cap.read(frame.array)
+        if success and image is frame.array:
+            return frame
+        frame.release()
+        return self.frame_pool.adopt(image) if success else None
+
+    def _infer(self, image):
+        if self.rate_controller is not None:
+            image = self.rate_controller.prepare(image)
+        self._rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        return self.pose.process(self._rgb).pose_landmarks
+
+    def _write_loop(self):
+        stats = self.stats["write"]
+        while True:
+            item = self._get(self.write_queue, stats)
+            if item is _END or item is None:
+                break
+            frame_num, frame, landmarks = item
+            image = frame.array
+
+            t0 = time.perf_counter()
+            if landmarks:
+                draw_pose(image, landmarks)
+            self.out.write(image)
+            frame.release()
+            stats.busy_time += time.perf_counter() - t0
+            stats.frames += 1
+
+    # --- Вспомогательное ---
+
+    def _guarded(self, target):
+        try:
+            target()
+        except Exception as e:
+            self._fail(e)
+
+    def _fail(self, error):
+        if self._error is None:
+            self._error = error
+        self._stop_event.set()
+
+    def _put(self, q, item, stats):
+        """Блокирующая запись в очередь (backpressure) с проверкой остановки"""
+        t0 = time.perf_counter()
+        try:
+            while True:
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    if self._stop_event.is_set():
+                        if item is _END:
+                            self._drain(q)
+                            continue
+                        return False
+        finally:
+            stats.wait_time += time.perf_counter() - t0
+
+    def _get(self, q, stats):
+        t0 = time.perf_counter()
+        try:
+            while True:
+                try:
+                    return q.get(timeout=0.1)
+                except queue.Empty:
+                    if self._stop_event.is_set() and q.empty():
+                        return None
+        finally:
+            stats.wait_time += time.perf_counter() - t0
+
+    @staticmethod
+    def _drain(q):
+        try:
+            while True:
+                q.get_nowait()
+        except queue.Empty:
+            pass
+
+    def _report_progress(self):
+        if self.progress_callback:
+            self.progress_callback(self.stats["write"].frames, self.total_frames)
+
+
+def format_pipeline_summary(summary):
+    stages = ", ".join(f"{name} {s['fps']} к/с" for name, s in summary['stages'].items())
+    return (f"Конвейер: {summary['frames']} кадров за {summary['elapsed_sec']} с "
+            f"({summary['fps']} к/с) | {stages} | узкое место: {summary['bottleneck']}")
@@ -0,0 +1,92 @@
+# tests/test_detect_intervals.py
+import numpy as np
+import pytest
+
+from modules.human_detector import HumanDetector, detect_intervals, frame_timestamps
+
+
+def per_frame_intervals(presence, timestamps, confidence=None, end_time=None, **hysteresis):
+    """Эталон: покадровый HumanDetector.update() + close()"""
+    detector = HumanDetector(**hysteresis)
+    for frame_num, (flag, ts) in enumerate(zip(presence, timestamps)):
+        detector.update(has_pose_landmarks=bool(flag), frame_num=frame_num, timestamp=float(ts),
+                        confidence=None if confidence is None else float(confidence[frame_num]))
+    detector.close(timestamp=end_time)
+    history = detector.detection_history.to_array()
+    return history['start'], history['end']
+
+
+def test_empty():
+    assert len(detect_intervals(np.zeros(0, dtype=bool), np.zeros(0))) == 0
+
+
+def test_without_hysteresis_every_run_is_an_interval():
+    presence = np.array([0, 1, 1, 0, 1, 0, 0, 1], dtype=bool)
+    intervals = detect_intervals(presence, frame_timestamps(len(presence), fps=10))
+    assert intervals['start_frame'].tolist() == [1, 4, 7]
+    assert intervals['end_frame'].tolist() == [3, 5, 8]
+    np.testing.assert_allclose(intervals['start'], [0.1, 0.4, 0.7])
+    np.testing.assert_allclose(intervals['end'], [0.3, 0.5, 0.8])
+
+
+def test_short_runs_are_absorbed():
+    # Вход требует 3 кадра подряд, выход — 2: одиночные сбои не рвут интервал
+    presence = np.array([1, 1, 0, 1, 1, 1, 0, 1, 1, 0, 0, 0], dtype=bool)
+    intervals = detect_intervals(presence, frame_timestamps(len(presence), fps=10),
+                                 enter_frames=3, exit_frames=2)
+    assert intervals['start_frame'].tolist() == [3]
+    assert intervals['end_frame'].tolist() == [9]
+
+
+def test_open_interval_closes_at_end_time():
+    presence = np.ones(5, dtype=bool)
+    intervals = detect_intervals(presence, frame_timestamps(5, fps=10), end_time=2.0)
+    assert intervals['end'].tolist() == [2.0]
+    assert intervals['end_frame'].tolist() == [5]
+    # По умолчанию — последний кадр плюс шаг таймлайна
+    intervals = detect_intervals(presence, frame_timestamps(5, fps=10))
+    np.testing.assert_allclose(intervals['end'], [0.5])
+
+
+def test_min_duration_applies_after_hysteresis():
+    # Сбой в кадре 3 склеивается гистерезисом выхода, поэтому первый интервал (0.0–0.6) длиннее порога;
+    # короткий второй (0.8–0.9) отбрасывается
+    presence = np.array([1, 1, 1, 0, 1, 1, 0, 0, 1, 0, 0], dtype=bool)
+    timestamps = frame_timestamps(len(presence), fps=10)
+    intervals = detect_intervals(presence, timestamps, exit_frames=2)
+    assert intervals['start_frame'].tolist() == [0, 8]
+    intervals = detect_intervals(presence, timestamps, exit_frames=2, min_duration=0.5)
+    assert intervals['start_frame'].tolist() == [0]
+    np.testing.assert_allclose(intervals['end'], [0.6])
+    # Без гистерезиса те же кадры дают только короткие интервалы
+    assert len(detect_intervals(presence, timestamps, min_duration=0.5)) == 0
+
+
+def test_low_confidence_frames_do_not_count():
+    presence = np.ones(6, dtype=bool)
+    confidence = np.array([0.9, 0.2, 0.9, 0.9, 0.9, 0.9])
+    intervals = detect_intervals(presence, frame_timestamps(6, fps=10), enter_frames=2,
+                                 min_confidence=0.5, confidence=confidence)
+    assert intervals['start_frame'].tolist() == [2]
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_matches_per_frame_detector(seed):
+    rng = np.random.default_rng(seed)
+    count = int(rng.integers(1, 80))
+    presence = rng.random(count) < rng.uniform(0.2, 0.8)
+    timestamps = 1000.0 + np.cumsum(rng.uniform(0.02, 0.1, count))
+    confidence = np.where(presence, rng.uniform(0.0, 1.0, count), 0.0) if seed % 2 else None
+    hysteresis = {
+        'enter_frames': int(rng.integers(1, 5)),
+        'exit_frames': int(rng.integers(1, 5)),
+        'enter_sec': float(rng.choice([0.0, 0.1, 0.2])),
+        'exit_sec': float(rng.choice([0.0, 0.1, 0.3])),
+        'min_confidence': float(rng.choice([0.0, 0.3])) if confidence is not None else 0.0,
+    }
+    end_time = float(timestamps[-1]) + 0.05
+
+    intervals = detect_intervals(presence, timestamps, confidence=confidence, end_time=end_time, **hysteresis)
+    starts, ends = per_frame_intervals(presence, timestamps, confidence, end_time, **hysteresis)
+    np.testing.assert_allclose(intervals['start'], starts)
+    np.testing.assert_allclose(intervals['end'], ends)